@@ -1,11 +1,14 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, List, Optional
+import json
 import logging
 
 from langchain_ollama import ChatOllama
 from src.config.settings import settings
+from src.app.batcher import MicroBatcher
 from src.app.rag_service import RAGService
 
 # Setup logging
@@ -31,6 +34,14 @@ chat_model = ChatOllama(
     top_p=settings.code_model_default_top_p,
 )
 
+# Groups concurrent non-streaming generations into batches
+batcher = MicroBatcher(
+    chat_model,
+    max_batch_size=settings.batch_max_size,
+    max_wait_seconds=settings.batch_max_wait_ms / 1000,
+    max_concurrency=settings.batch_max_concurrency,
+)
+
 
 # Pydantic models for request validation
 class ToolResult(BaseModel):
@@ -41,19 +52,49 @@ class ToolResult(BaseModel):
 class InvocationRequest(BaseModel):
     prompt: str
     tool_result: Optional[ToolResult] = None
+    # Stream the generation as NDJSON frames instead of a single JSON body
+    stream: bool = False
 
 
 # Initialize services
 rag_service = RAGService()
 
 
-@app.post("/invocations")
-async def sagemaker_invocations(request: InvocationRequest):
+def _ndjson_frame(frame: dict) -> bytes:
+    return (json.dumps(frame) + "\n").encode()
+
+
+async def _generation_frames(prompt: str, sources: List[dict]) -> AsyncIterator[bytes]:
     """
-    SageMaker-compatible endpoint for RAG-based generation.
-    Accepts a user prompt and optional tool results for embedding.
-    Returns a non-streaming response.
+    Yield the NDJSON frames of a streamed generation.
+
+    Frames, one JSON object per line:
+        - {"type": "sources", "sources": [...]}, sent first.
+        - {"type": "token", "text": "..."}, one per generated chunk.
+        - {"type": "done"}, after the last token; or {"type": "error", "detail": "..."}.
     """
+    yield _ndjson_frame({"type": "sources", "sources": sources})
+    try:
+        async for chunk in chat_model.astream(prompt):
+            if chunk.content:
+                yield _ndjson_frame({"type": "token", "text": chunk.content})
+        yield _ndjson_frame({"type": "done"})
+    except Exception as e:
+        # The status line has been sent; report the failure in-band
+        logger.error(f"Streaming invocation error: {str(e)}", exc_info=True)
+        yield _ndjson_frame({"type": "error", "detail": f"Internal server error: {str(e)}"})
+
+
+def _streaming_response(prompt: str, sources: List[dict]) -> StreamingResponse:
+    return StreamingResponse(
+        _generation_frames(prompt, sources),
+        media_type="application/x-ndjson",
+        # Keep nginx from buffering the chunks
+        headers={"X-Accel-Buffering": "no"},
+    )
+
+
+async def _invoke(request: InvocationRequest, stream: bool):
     try:
         # Extract query
         query = request.prompt
@@ -63,8 +104,14 @@ async def sagemaker_invocations(request: InvocationRequest):
         # Retrieve documents and build RAG prompt
         formatted_rag_prompt, sources = await rag_service.build_rag_prompt(query=query)
 
+        if stream:
+            return _streaming_response(formatted_rag_prompt, sources)
+
         # Non-streaming response
-        response = chat_model.invoke(formatted_rag_prompt)
+        if settings.batching_enabled:
+            response = await batcher.ainvoke(formatted_rag_prompt)
+        else:
+            response = await chat_model.ainvoke(formatted_rag_prompt)
         generated_text = response.content
 
         return {"generated_code": generated_text.strip(), "sources": sources}
@@ -76,6 +123,38 @@ async def sagemaker_invocations(request: InvocationRequest):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@app.post("/invocations")
+async def sagemaker_invocations(request: InvocationRequest):
+    """
+    SageMaker-compatible endpoint for RAG-based generation.
+    Accepts a user prompt and optional tool results for embedding.
+    Returns a single JSON response, or NDJSON frames (see /invocations-stream) when
+    the request sets "stream": true.
+    """
+    return await _invoke(request, stream=request.stream)
+
+
+@app.post("/invocations-stream")
+async def sagemaker_invocations_stream(request: InvocationRequest):
+    """
+    Streaming variant of /invocations, for InvokeEndpointWithResponseStream.
+    Returns chunked NDJSON: a leading sources frame, token frames as the model
+    generates them, then a done (or error) frame.
+    """
+    return await _invoke(request, stream=True)
+
+
 @app.get("/ping")
 async def sagemaker_ping():
     return {"status": "healthy"}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Batching histograms and retrieval cache statistics of this worker."""
+    return {
+        "batcher": batcher.stats(),
+        "retrieval_cache": (
+            rag_service.retrieval_cache.stats() if rag_service.retrieval_cache is not None else None
+        ),
+    }
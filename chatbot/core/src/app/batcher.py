@@ -0,0 +1,157 @@
+import asyncio
+import bisect
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Sequence
+
+from langchain_core.language_models import BaseChatModel
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+QUEUE_DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128)
+WAIT_SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds, like a Prometheus histogram."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip([*map(str, self.buckets), "+Inf"], self._counts):
+                cumulative += count
+                buckets[bound] = cumulative
+            return {"buckets": buckets, "count": cumulative, "sum": round(self._sum, 6)}
+
+
+@dataclass
+class _Pending:
+    prompt: Any
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class MicroBatcher:
+    """
+    Groups concurrent generation requests into batches for the chat model.
+
+    A batch is dispatched when `max_batch_size` requests are waiting, or `max_wait_seconds`
+    after its first request arrived. At most `max_concurrency` batches run at once; each is
+    sent with `abatch` and every result (or exception) is returned to its own caller.
+    """
+
+    def __init__(
+        self,
+        model: BaseChatModel,
+        max_batch_size: int = 8,
+        max_wait_seconds: float = 0.01,
+        max_concurrency: int = 2,
+    ):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.max_concurrency = max_concurrency
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight: set[asyncio.Task] = set()
+        self.batch_size = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_depth = Histogram(QUEUE_DEPTH_BUCKETS)
+        self.wait_seconds = Histogram(WAIT_SECONDS_BUCKETS)
+        self.batches = 0
+        self.errors = 0
+
+    async def ainvoke(self, prompt: Any) -> Any:
+        """Generate a response for one prompt as part of the next batch."""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Pending(prompt, future))
+        return await future
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_seconds * 1000,
+            "max_concurrency": self.max_concurrency,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running_batches": len(self._in_flight),
+            "batches": self.batches,
+            "errors": self.errors,
+            "batch_size": self.batch_size.snapshot(),
+            "queue_depth": self.queue_depth.snapshot(),
+            "wait_seconds": self.wait_seconds.snapshot(),
+        }
+
+    def _ensure_worker(self):
+        # The queue and worker belong to the event loop of the first request
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._worker = asyncio.get_running_loop().create_task(self._collect())
+
+    async def _collect(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = batch[0].enqueued_at + self.max_wait_seconds
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Requests left waiting once this batch is full
+            self.queue_depth.observe(self._queue.qsize())
+
+            await self._semaphore.acquire()
+            task = asyncio.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch: List[_Pending]):
+        try:
+            # Callers that gave up (e.g. disconnected) are not sent to the model
+            batch = [pending for pending in batch if not pending.future.done()]
+            if not batch:
+                return
+            dispatched_at = time.perf_counter()
+            for pending in batch:
+                self.wait_seconds.observe(dispatched_at - pending.enqueued_at)
+            self.batch_size.observe(len(batch))
+            self.batches += 1
+
+            results = await self.model.abatch(
+                [pending.prompt for pending in batch],
+                config={"max_concurrency": len(batch)},
+                return_exceptions=True,
+            )
+            for pending, result in zip(batch, results):
+                if pending.future.done():
+                    continue
+                if isinstance(result, Exception):
+                    self.errors += 1
+                    pending.future.set_exception(result)
+                else:
+                    pending.future.set_result(result)
+        except Exception as e:
+            logger.error(f"Batch generation failed: {str(e)}", exc_info=True)
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+        finally:
+            self._semaphore.release()
@@ -1,8 +1,13 @@
+import asyncio
 import boto3
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
 from langchain_aws.retrievers import AmazonKnowledgeBasesRetriever
 from langchain.prompts import ChatPromptTemplate
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential
+from src.app.retrieval_cache import RetrievalCache
 from src.config.settings import settings
 
 
@@ -14,9 +19,27 @@ class RAGService:
             )
 
         self.knowledge_base_id = settings.bedrock_kb
+        # One client (thread-safe, with its own connection pool) for every retrieval
         self.bedrock_client = boto3.client(
             "bedrock-agent-runtime",
             region_name=settings.aws_region,
+            config=Config(max_pool_connections=settings.retrieval_max_workers),
+        )
+        # The retriever is blocking: it runs on a bounded pool, off the event loop
+        self.retrieval_executor = ThreadPoolExecutor(
+            max_workers=settings.retrieval_max_workers,
+            thread_name_prefix="kb-retrieve",
+        )
+        self._retrievers: dict[int, AmazonKnowledgeBasesRetriever] = {}
+        self._retrievers_lock = threading.Lock()
+        self.retrieval_cache = (
+            RetrievalCache(
+                max_entries=settings.retrieval_cache_max_entries,
+                ttl_seconds=settings.retrieval_cache_ttl_seconds,
+                redis_url=settings.retrieval_cache_redis_url,
+            )
+            if settings.retrieval_cache_enabled
+            else None
         )
         self.session = boto3.Session()
         self.credentials = self.session.get_credentials()
@@ -33,14 +56,41 @@ class RAGService:
             [("system", self.system_prompt), ("human", "{input}")]
         )
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=10))
+    def get_retriever(self, num_results: int = 4) -> AmazonKnowledgeBasesRetriever:
+        """Return the retriever for a result count, built once on the shared client."""
+        with self._retrievers_lock:
+            retriever = self._retrievers.get(num_results)
+            if retriever is None:
+                retriever = AmazonKnowledgeBasesRetriever(
+                    knowledge_base_id=self.knowledge_base_id,
+                    retrieval_config={
+                        "vectorSearchConfiguration": {"numberOfResults": num_results}
+                    },
+                    client=self.bedrock_client,
+                )
+                self._retrievers[num_results] = retriever
+            return retriever
+
     async def retrieve_documents(self, query: str, num_results: int = 4) -> list:
-        retriever = AmazonKnowledgeBasesRetriever(
-            knowledge_base_id=self.knowledge_base_id,
-            retrieval_config={"vectorSearchConfiguration": {"numberOfResults": num_results}},
-            region_name=settings.aws_region,
-        )
-        documents = retriever.invoke(query)
+        # Cached documents are already parsed
+        if self.retrieval_cache is not None:
+            documents = await self.retrieval_cache.get(query, num_results)
+            if documents is not None:
+                return documents
+
+        retriever = self.get_retriever(num_results)
+        loop = asyncio.get_running_loop()
+        # Retries wait with asyncio.sleep, so other requests keep being served
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(settings.retrieval_max_attempts),
+            wait=wait_exponential(multiplier=1, min=1, max=10),
+            sleep=asyncio.sleep,
+            reraise=True,
+        ):
+            with attempt:
+                documents = await loop.run_in_executor(
+                    self.retrieval_executor, retriever.invoke, query
+                )
         # Parse raw JSON if necessary
         parsed_documents = []
         for doc in documents:
@@ -54,6 +104,8 @@ class RAGService:
                 parsed_documents.append(doc)
             except json.JSONDecodeError:
                 parsed_documents.append(doc)
+        if self.retrieval_cache is not None:
+            await self.retrieval_cache.set(query, num_results, parsed_documents)
         return parsed_documents
 
     async def build_rag_prompt(self, query: str, num_results: int = 4):
@@ -88,4 +140,4 @@ class RAGService:
                 prompt += f"Human: {message.content}\n"
         prompt += "Assistant: "
 
-        return prompt, sources
\ No newline at end of file
+        return prompt, sources
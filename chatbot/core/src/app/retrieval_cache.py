@@ -0,0 +1,130 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from langchain_core.documents import Document
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # The Redis tier is optional
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+class RetrievalCache:
+    """
+    Cache of parsed Knowledge Base documents, keyed by normalized query and result count.
+
+    The local tier is a size-bounded LRU with a TTL, private to each worker process.
+    When a Redis URL is configured, entries are also shared through Redis with the same
+    TTL; a Redis hit is copied into the local tier. Redis errors are logged and treated
+    as misses.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 300,
+        redis_url: Optional[str] = None,
+        prefix: str = "kb",
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        # key -> (expiry, documents), in LRU order
+        self._entries: OrderedDict[str, tuple[float, List[Document]]] = OrderedDict()
+        self._redis = None
+        if redis_url:
+            if redis is None:
+                logger.warning("redis is not installed; the retrieval cache is local only")
+            else:
+                self._redis = redis.from_url(redis_url, decode_responses=True)
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(query.casefold().split())
+
+    def make_key(self, query: str, num_results: int) -> str:
+        digest = hashlib.sha256(self.normalize(query).encode()).hexdigest()[:32]
+        return f"{self.prefix}:{num_results}:{digest}"
+
+    async def get(self, query: str, num_results: int) -> Optional[List[Document]]:
+        """Return the cached documents for a query, or None."""
+        key = self.make_key(query, num_results)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(entry[1])
+            if entry is not None:
+                del self._entries[key]
+
+        if self._redis is not None:
+            try:
+                raw = await self._redis.get(key)
+            except Exception as e:
+                logger.warning(f"Retrieval cache read failed: {e}")
+                self._count("errors")
+                raw = None
+            if raw is not None:
+                documents = [Document(**item) for item in json.loads(raw)]
+                self._store_local(key, documents)
+                self._count("redis_hits")
+                return list(documents)
+
+        self._count("misses")
+        return None
+
+    async def set(self, query: str, num_results: int, documents: List[Document]):
+        """Store the parsed documents retrieved for a query."""
+        key = self.make_key(query, num_results)
+        self._store_local(key, list(documents))
+        if self._redis is None:
+            return
+        payload = json.dumps(
+            [{"page_content": d.page_content, "metadata": d.metadata} for d in documents],
+            default=str,
+        )
+        try:
+            await self._redis.set(key, payload, ex=max(int(self.ttl_seconds), 1))
+        except Exception as e:
+            logger.warning(f"Retrieval cache write failed: {e}")
+            self._count("errors")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.redis_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_rate": (
+                    round((self.hits + self.redis_hits) / lookups, 4) if lookups else None
+                ),
+                "redis": self._redis is not None,
+            }
+
+    def _store_local(self, key: str, documents: List[Document]):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, documents)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
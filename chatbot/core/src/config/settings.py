@@ -3,6 +3,10 @@ import os
 from pydantic_settings import BaseSettings
 
 
+def _env_bool(key: str, default: str) -> bool:
+    return os.getenv(key, default).strip().lower() in ("1", "true", "yes", "on")
+
+
 class Settings(BaseSettings):
     # Application settings
     app_name: str = "Agent Model Inference Service"
@@ -12,8 +16,23 @@ class Settings(BaseSettings):
     code_model_default_temperature: float = 0.7
     code_model_default_top_p: float = 0.95
 
+    # Micro-batching of non-streaming generations
+    batching_enabled: bool = _env_bool("BATCHING_ENABLED", "true")
+    batch_max_size: int = int(os.getenv("BATCH_MAX_SIZE", "8"))
+    batch_max_wait_ms: float = float(os.getenv("BATCH_MAX_WAIT_MS", "10"))
+    batch_max_concurrency: int = int(os.getenv("BATCH_MAX_CONCURRENCY", "2"))
+
     # Bedrock Knowledge Base
     bedrock_kb: str | None = os.getenv("BEDROCK_KB")
+    # Concurrent Knowledge Base retrievals per worker (threads and client connections)
+    retrieval_max_workers: int = int(os.getenv("RETRIEVAL_MAX_WORKERS", "8"))
+    retrieval_max_attempts: int = int(os.getenv("RETRIEVAL_MAX_ATTEMPTS", "3"))
+
+    # Retrieval cache (the Redis tier is used when a URL is set and redis is installed)
+    retrieval_cache_enabled: bool = _env_bool("RETRIEVAL_CACHE_ENABLED", "true")
+    retrieval_cache_max_entries: int = int(os.getenv("RETRIEVAL_CACHE_MAX_ENTRIES", "1024"))
+    retrieval_cache_ttl_seconds: float = float(os.getenv("RETRIEVAL_CACHE_TTL_SECONDS", "300"))
+    retrieval_cache_redis_url: str | None = os.getenv("RETRIEVAL_CACHE_REDIS_URL")
 
     # OpenSearch Serverless
     aws_region: str = os.getenv('AWS_REGION')
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Microbenchmark of the agent's per-request setup cost.
+
+Compares the old per-request setup (bind tools, build and compile the StateGraph,
+build the tool lookup) with the process-wide compiled graph and bound model that
+Graph now reuses. No request is sent to Bedrock; a local ChatBedrockConverse
+instance stands in for the configured model so no secret is needed.
+
+Usage (from chatbot/handler):
+    python scripts/bench_graph_setup.py --iterations 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+HANDLER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(HANDLER_DIR, "src"))
+os.environ.setdefault(
+    "SECRET_ARN", "arn:aws:secretsmanager:ap-southeast-2:000000000000:secret:bench"
+)
+
+from langchain_aws import ChatBedrockConverse  # noqa: E402
+
+from services.agent import graph, llm  # noqa: E402
+from services.agent.tools import TOOLS  # noqa: E402
+
+
+def per_request_setup():
+    """What every request paid before the graph was shared."""
+    llm.get_llm().bind_tools(TOOLS)
+    graph.build_workflow().compile()
+    {tool.name: tool for tool in TOOLS}
+
+
+def shared_setup():
+    """What every request pays now."""
+    graph.get_compiled_graph()
+    graph.get_bound_model()
+    graph.Graph(session_id="00000000-0000-0000-0000-000000000000")
+
+
+def measure(fn, iterations: int) -> list[float]:
+    fn()  # warm up imports and lazy resources
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(name: str, timings: list[float]) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(
+        f"{name:<18} mean {statistics.mean(timings):9.3f} ms  "
+        f"p50 {statistics.median(timings):9.3f} ms  p95 {p95:9.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    llm.get_llm.set(
+        ChatBedrockConverse(
+            model="anthropic.claude-3-haiku-20240307-v1:0",
+            temperature=0,
+            region_name="ap-southeast-2",
+        )
+    )
+
+    before = measure(per_request_setup, args.iterations)
+    after = measure(shared_setup, args.iterations)
+    summarize("per-request (old)", before)
+    summarize("shared (new)", after)
+    print(f"speedup            {statistics.mean(before) / statistics.mean(after):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
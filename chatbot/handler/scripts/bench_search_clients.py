@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Benchmark of cold vs warm search tool latency.
+
+"Cold" drops the shared HTTP client before every call, so each search opens a new
+connection and TLS session, as the per-call TavilySearch/GoogleSerperAPIWrapper
+objects used to. "Warm" reuses the process-wide keep-alive client the tools use now.
+Results are not cached: the search clients are called directly, below the tool cache.
+
+Searching needs the API keys from the configured secret (SECRET_ARN). Without them,
+pass --url to time a plain GET to any HTTPS endpoint over the same clients, which
+isolates the connection setup cost.
+
+Usage (from chatbot/handler):
+    SECRET_ARN=... python scripts/bench_search_clients.py --tool tavily --iterations 10
+    python scripts/bench_search_clients.py --url https://api.tavily.com --iterations 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+HANDLER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(HANDLER_DIR, "src"))
+os.environ.setdefault(
+    "SECRET_ARN", "arn:aws:secretsmanager:ap-southeast-2:000000000000:secret:bench"
+)
+
+from services.agent import search_clients  # noqa: E402
+
+
+def make_call(args):
+    if args.url:
+        return lambda: search_clients.get_http_client().get(args.url)
+    if args.tool == "tavily":
+        client = search_clients.get_tavily_client()
+        return lambda: client.run(args.query)
+    client = search_clients.get_serper_client()
+    return lambda: client.results(args.query)
+
+
+def make_async_call(args):
+    if args.url:
+        return lambda: search_clients.get_async_http_client().get(args.url)
+    if args.tool == "tavily":
+        client = search_clients.get_tavily_client()
+        return lambda: client.arun(args.query)
+    client = search_clients.get_serper_client()
+    return lambda: client.aresults(args.query)
+
+
+def measure(call, iterations: int, cold: bool) -> list[float]:
+    call()  # warm up imports, secrets and DNS
+    timings = []
+    for _ in range(iterations):
+        if cold:
+            search_clients.get_http_client().close()
+            search_clients.get_http_client.reset()
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def ameasure(call, iterations: int, cold: bool) -> list[float]:
+    await call()
+    timings = []
+    for _ in range(iterations):
+        if cold:
+            await search_clients.get_async_http_client().aclose()
+        start = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(name: str, timings: list[float]) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[max(int(len(ordered) * 0.95) - 1, 0)]
+    print(
+        f"{name:<12} mean {statistics.mean(timings):9.1f} ms  "
+        f"p50 {statistics.median(timings):9.1f} ms  p95 {p95:9.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tool", choices=["tavily", "serper"], default="tavily")
+    parser.add_argument("--query", default="latest AWS Lambda runtime versions")
+    parser.add_argument("--url", help="Time a GET to this URL instead of a search")
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    call = make_call(args)
+    summarize("sync cold", measure(call, args.iterations, cold=True))
+    summarize("sync warm", measure(call, args.iterations, cold=False))
+
+    async def run_async():
+        acall = make_async_call(args)
+        summarize("async cold", await ameasure(acall, args.iterations, cold=True))
+        summarize("async warm", await ameasure(acall, args.iterations, cold=False))
+
+    asyncio.run(run_async())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+"""
+Report the import-time (cold start) cost of the Lambda entry point per module.
+
+Imports the entry point in a fresh interpreter with `python -X importtime`, parses the
+timings written to stderr and prints the most expensive modules and top-level packages.
+Nothing should touch the network at import time, so a placeholder SECRET_ARN is used
+when none is set.
+
+Usage (from chatbot/handler):
+    python scripts/import_profile.py
+    python scripts/import_profile.py --top 40 --module src.lambda_handler
+    python scripts/import_profile.py --json > import_profile.json
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+HANDLER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIRST_PARTY = {
+    "src",
+    "main",
+    "config",
+    "database",
+    "repositories",
+    "routes",
+    "schemas",
+    "services",
+}
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( +)(\S+)\s*$")
+
+
+def run_importtime(module: str) -> str:
+    """Import `module` under -X importtime and return the raw stderr report."""
+    env = dict(os.environ)
+    env.setdefault(
+        "SECRET_ARN",
+        "arn:aws:secretsmanager:ap-southeast-2:000000000000:secret:import-profile",
+    )
+    env.setdefault("AWS_DEFAULT_REGION", "ap-southeast-2")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=HANDLER_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f"Importing {module} failed with exit code {proc.returncode}")
+    return proc.stderr
+
+
+def parse_importtime(output: str) -> list[dict]:
+    """Parse `-X importtime` lines into dicts with self/cumulative microseconds."""
+    entries = []
+    for line in output.splitlines():
+        match = LINE_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        entries.append(
+            {
+                "module": name,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(indent) - 1) // 2,
+            }
+        )
+    return entries
+
+
+def build_report(entries: list[dict], top: int) -> dict:
+    """Summarise total, per-package and per-module import cost."""
+    total_us = sum(e["cumulative_us"] for e in entries if e["depth"] == 0)
+
+    packages = defaultdict(int)
+    for entry in entries:
+        packages[entry["module"].split(".")[0]] += entry["self_us"]
+
+    first_party = [e for e in entries if e["module"].split(".")[0] in FIRST_PARTY]
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "module_count": len(entries),
+        "packages": [
+            {"package": name, "self_ms": round(us / 1000, 1)}
+            for name, us in sorted(packages.items(), key=lambda p: p[1], reverse=True)[
+                :top
+            ]
+        ],
+        "modules": [
+            {
+                "module": e["module"],
+                "self_ms": round(e["self_us"] / 1000, 1),
+                "cumulative_ms": round(e["cumulative_us"] / 1000, 1),
+            }
+            for e in sorted(entries, key=lambda e: e["cumulative_us"], reverse=True)[
+                :top
+            ]
+        ],
+        "first_party": [
+            {
+                "module": e["module"],
+                "self_ms": round(e["self_us"] / 1000, 1),
+                "cumulative_ms": round(e["cumulative_us"] / 1000, 1),
+            }
+            for e in sorted(first_party, key=lambda e: e["cumulative_us"], reverse=True)
+        ],
+    }
+
+
+def print_report(module: str, report: dict) -> None:
+    print(
+        f"Import of {module}: {report['total_ms']} ms, {report['module_count']} modules"
+    )
+
+    print("\nTop packages by self time:")
+    for row in report["packages"]:
+        print(f"  {row['self_ms']:>9.1f} ms  {row['package']}")
+
+    print("\nTop modules by cumulative time:")
+    for row in report["modules"]:
+        print(
+            f"  {row['cumulative_ms']:>9.1f} ms  (self {row['self_ms']:>7.1f})  {row['module']}"
+        )
+
+    print("\nFirst-party modules:")
+    for row in report["first_party"]:
+        print(
+            f"  {row['cumulative_ms']:>9.1f} ms  (self {row['self_ms']:>7.1f})  {row['module']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--module", default="src.lambda_handler")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = build_report(parse_importtime(run_importtime(args.module)), args.top)
+    if args.json:
+        print(json.dumps({"module": args.module, **report}, indent=2))
+    else:
+        print_report(args.module, report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,239 +1,311 @@
 import os
-import json
 import logging
 import boto3
-from botocore.exceptions import ClientError
+
+from .lazy import LazyResource
+from .secret_cache import SecretCache
 
 # Logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 
+def _as_bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 class AppConfig:
     def __init__(self):
-        self._client = boto3.client("secretsmanager", region_name="ap-southeast-2")
+        self._client = LazyResource(
+            lambda: boto3.client("secretsmanager", region_name="ap-southeast-2"),
+            name="secretsmanager_client",
+        )
         self._secret_arn = os.environ["SECRET_ARN"]
+        self._secrets = SecretCache(
+            self._client,
+            self._secret_arn,
+            ttl_seconds=float(os.environ.get("SECRET_CACHE_TTL_SECONDS", "300")),
+        )
 
-    @property
-    def DATABASE_URL(self):
+    def _get(self, key: str):
         try:
-            resp = self._client.get_secret_value(SecretId=self._secret_arn)
-            secret = json.loads(resp["SecretString"])
-            return secret["DATABASE_URL"]
-        except ClientError as e:
-            logger.error(f"Secrets Manager error: {e}")
-            raise
-        except (json.JSONDecodeError, KeyError) as e:
+            return self._secrets.get(key)
+        except KeyError as e:
             logger.error(f"Invalid secret: {e}")
             raise
 
+    def refresh(self):
+        """Re-fetch the secret now, e.g. after a credential rotation."""
+        self._secrets.refresh()
+
+    def secret_stats(self) -> dict:
+        """Return hit/miss counters and fetch latency of the secret cache."""
+        return self._secrets.stats()
+
+    @staticmethod
+    def _env(key: str, default, cast=str):
+        """Read a tunable from the environment rather than the secret."""
+        value = os.environ.get(key)
+        return cast(value) if value is not None else default
+
+    # Chat history connection pool
+
+    @property
+    def HISTORY_POOL_MIN_SIZE(self) -> int:
+        return self._env("HISTORY_POOL_MIN_SIZE", 1, int)
+
+    @property
+    def HISTORY_POOL_MAX_SIZE(self) -> int:
+        return self._env("HISTORY_POOL_MAX_SIZE", 5, int)
+
+    @property
+    def HISTORY_POOL_MAX_LIFETIME(self) -> float:
+        """Seconds after which a pooled connection is closed and replaced."""
+        return self._env("HISTORY_POOL_MAX_LIFETIME", 1800.0, float)
+
+    @property
+    def HISTORY_POOL_MAX_IDLE(self) -> float:
+        """Seconds an unused connection above min_size is kept open."""
+        return self._env("HISTORY_POOL_MAX_IDLE", 300.0, float)
+
+    @property
+    def HISTORY_POOL_TIMEOUT(self) -> float:
+        """Seconds to wait for a free connection before failing."""
+        return self._env("HISTORY_POOL_TIMEOUT", 10.0, float)
+
+    # Agent
+
+    @property
+    def TOOL_TIMEOUT_SECONDS(self) -> float:
+        """Upper bound on a single tool call made by the agent."""
+        return self._env("TOOL_TIMEOUT_SECONDS", 20.0, float)
+
+    @property
+    def ATTACHMENT_MEMORY_BUDGET_BYTES(self) -> int:
+        """Largest combined size of the attachments sent with one message."""
+        return self._env("ATTACHMENT_MEMORY_BUDGET_BYTES", 20 * 1024 * 1024, int)
+
+    # Conversation context
+
+    @property
+    def HISTORY_TOKEN_BUDGET(self) -> int:
+        """Approximate number of tokens of history (and summary) sent to the model."""
+        return self._env("HISTORY_TOKEN_BUDGET", 6000, int)
+
+    @property
+    def HISTORY_FETCH_LIMIT(self) -> int:
+        """Most recent history messages read before packing them into the budget."""
+        return self._env("HISTORY_FETCH_LIMIT", 50, int)
+
+    @property
+    def TOOL_OUTPUT_MAX_TOKENS(self) -> int:
+        """Approximate size a single tool output in the history is truncated to."""
+        return self._env("TOOL_OUTPUT_MAX_TOKENS", 1000, int)
+
+    @property
+    def HISTORY_SUMMARY_ENABLED(self) -> bool:
+        """Fold turns that no longer fit the budget into a per-session summary."""
+        return self._env("HISTORY_SUMMARY_ENABLED", True, _as_bool)
+
+    @property
+    def HISTORY_SUMMARY_MAX_WORDS(self) -> int:
+        return self._env("HISTORY_SUMMARY_MAX_WORDS", 250, int)
+
+    @property
+    def HISTORY_SUMMARY_BATCH_SIZE(self) -> int:
+        """Most messages folded into the summary by one update."""
+        return self._env("HISTORY_SUMMARY_BATCH_SIZE", 50, int)
+
+    # S3 uploads
+
+    @property
+    def S3_UPLOAD_MAX_WORKERS(self) -> int:
+        """Threads running blocking uploads off the event loop."""
+        return self._env("S3_UPLOAD_MAX_WORKERS", 8, int)
+
+    @property
+    def S3_MULTIPART_THRESHOLD_BYTES(self) -> int:
+        return self._env("S3_MULTIPART_THRESHOLD_BYTES", 8 * 1024 * 1024, int)
+
+    @property
+    def S3_MULTIPART_CHUNKSIZE_BYTES(self) -> int:
+        return self._env("S3_MULTIPART_CHUNKSIZE_BYTES", 8 * 1024 * 1024, int)
+
+    @property
+    def S3_MULTIPART_MAX_CONCURRENCY(self) -> int:
+        """Parts of one multipart upload sent in parallel."""
+        return self._env("S3_MULTIPART_MAX_CONCURRENCY", 4, int)
+
+    # Redis connection pool
+
+    @property
+    def REDIS_MAX_CONNECTIONS(self) -> int:
+        return self._env("REDIS_MAX_CONNECTIONS", 20, int)
+
+    @property
+    def REDIS_SOCKET_TIMEOUT_SECONDS(self) -> float:
+        return self._env("REDIS_SOCKET_TIMEOUT_SECONDS", 2.0, float)
+
+    @property
+    def REDIS_CONNECT_TIMEOUT_SECONDS(self) -> float:
+        return self._env("REDIS_CONNECT_TIMEOUT_SECONDS", 2.0, float)
+
+    @property
+    def REDIS_HEALTH_CHECK_INTERVAL_SECONDS(self) -> int:
+        """Idle connections are pinged before reuse once this old."""
+        return self._env("REDIS_HEALTH_CHECK_INTERVAL_SECONDS", 30, int)
+
+    # Presigned URL cache
+
+    @property
+    def PRESIGN_CACHE_MAX_ENTRIES(self) -> int:
+        return self._env("PRESIGN_CACHE_MAX_ENTRIES", 2048, int)
+
+    @property
+    def PRESIGN_CACHE_MIN_REMAINING_RATIO(self) -> float:
+        """Share of a URL's lifetime that must remain for a cached URL to be reused."""
+        return self._env("PRESIGN_CACHE_MIN_REMAINING_RATIO", 0.5, float)
+
+    @property
+    def PRESIGN_CACHE_REDIS(self) -> bool:
+        """Also share presigned URLs between instances through Redis."""
+        return self._env("PRESIGN_CACHE_REDIS", False, _as_bool)
+
+    # Chat response cache
+
+    @property
+    def RESPONSE_CACHE_ENABLED(self) -> bool:
+        return self._env("RESPONSE_CACHE_ENABLED", True, _as_bool)
+
+    @property
+    def RESPONSE_CACHE_TTL_SECONDS(self) -> int:
+        """
+        Lifetime of a cached chat list/detail body. Cached chat details embed presigned
+        URLs, so keep this well below the time they are guaranteed to stay valid
+        (1 hour x PRESIGN_CACHE_MIN_REMAINING_RATIO).
+        """
+        return self._env("RESPONSE_CACHE_TTL_SECONDS", 300, int)
+
+    # Semantic answer cache
+
+    @property
+    def SEMANTIC_CACHE_ENABLED(self) -> bool:
+        return self._env("SEMANTIC_CACHE_ENABLED", False, _as_bool)
+
+    @property
+    def SEMANTIC_CACHE_EMBEDDER(self) -> str:
+        """ "hashing" (local, near-duplicates only) or "bedrock" (paraphrases)."""
+        return self._env("SEMANTIC_CACHE_EMBEDDER", "hashing")
+
+    @property
+    def SEMANTIC_CACHE_EMBEDDING_MODEL_ID(self) -> str:
+        return self._env(
+            "SEMANTIC_CACHE_EMBEDDING_MODEL_ID", "amazon.titan-embed-text-v2:0"
+        )
+
+    @property
+    def SEMANTIC_CACHE_THRESHOLD(self) -> float:
+        """Minimum cosine similarity for a stored question to count as a match."""
+        return self._env("SEMANTIC_CACHE_THRESHOLD", 0.9, float)
+
+    @property
+    def SEMANTIC_CACHE_TTL_SECONDS(self) -> float:
+        return self._env("SEMANTIC_CACHE_TTL_SECONDS", 3600.0, float)
+
+    @property
+    def SEMANTIC_CACHE_MAX_ENTRIES(self) -> int:
+        return self._env("SEMANTIC_CACHE_MAX_ENTRIES", 1000, int)
+
+    # Search API HTTP clients
+
+    @property
+    def SEARCH_HTTP_TIMEOUT_SECONDS(self) -> float:
+        return self._env("SEARCH_HTTP_TIMEOUT_SECONDS", 15.0, float)
+
+    @property
+    def SEARCH_HTTP_MAX_CONNECTIONS(self) -> int:
+        return self._env("SEARCH_HTTP_MAX_CONNECTIONS", 20, int)
+
+    @property
+    def SEARCH_HTTP_KEEPALIVE_SECONDS(self) -> float:
+        """How long an idle connection to a search API is kept open for reuse."""
+        return self._env("SEARCH_HTTP_KEEPALIVE_SECONDS", 120.0, float)
+
+    @property
+    def DATABASE_URL(self):
+        return self._get("DATABASE_URL")
+
     @property
     def AWS_REGION_NAME(self):
-        try:
-            resp = self._client.get_secret_value(SecretId=self._secret_arn)
-            secret = json.loads(resp["SecretString"])
-            return secret["AWS_REGION_NAME"]
-        except ClientError as e:
-            logger.error(f"Secrets Manager error: {e}")
-            raise
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Invalid secret: {e}")
-            raise
+        return self._get("AWS_REGION_NAME")
 
     @property
     def AWS_BEDROCK_MODEL_ID(self):
-        try:
-            resp = self._client.get_secret_value(SecretId=self._secret_arn)
-            secret = json.loads(resp["SecretString"])
-            return secret["AWS_BEDROCK_MODEL_ID"]
-        except ClientError as e:
-            logger.error(f"Secrets Manager error: {e}")
-            raise
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Invalid secret: {e}")
-            raise
+        return self._get("AWS_BEDROCK_MODEL_ID")
 
     @property
     def SERPER_API_KEY(self):
-        try:
-            resp = self._client.get_secret_value(SecretId=self._secret_arn)
-            secret = json.loads(resp["SecretString"])
-            return secret["SERPER_API_KEY"]
-        except ClientError as e:
-            logger.error(f"Secrets Manager error: {e}")
-            raise
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Invalid secret: {e}")
-            raise
+        return self._get("SERPER_API_KEY")
 
     @property
     def TAVILY_API_KEY(self):
-        try:
-            resp = self._client.get_secret_value(SecretId=self._secret_arn)
-            secret = json.loads(resp["SecretString"])
-            return secret["TAVILY_API_KEY"]
-        except ClientError as e:
-            logger.error(f"Secrets Manager error: {e}")
-            raise
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Invalid secret: {e}")
-            raise
+        return self._get("TAVILY_API_KEY")
 
     @property
     def JWT_ACCESS_SECRET(self):
-        try:
-            resp = self._client.get_secret_value(SecretId=self._secret_arn)
-            secret = json.loads(resp["SecretString"])
-            return secret["JWT_ACCESS_SECRET"]
-        except ClientError as e:
-            logger.error(f"Secrets Manager error: {e}")
-            raise
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Invalid secret: {e}")
-            raise
+        return self._get("JWT_ACCESS_SECRET")
 
     @property
     def JWT_REFRESH_SECRET(self):
-        try:
-            resp = self._client.get_secret_value(SecretId=self._secret_arn)
-            secret = json.loads(resp["SecretString"])
-            return secret["JWT_REFRESH_SECRET"]
-        except ClientError as e:
-            logger.error(f"Secrets Manager error: {e}")
-            raise
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Invalid secret: {e}")
-            raise
+        return self._get("JWT_REFRESH_SECRET")
 
     @property
     def JWT_ALGORITHM(self):
-        try:
-            resp = self._client.get_secret_value(SecretId=self._secret_arn)
-            secret = json.loads(resp["SecretString"])
-            return secret["JWT_ALGORITHM"]
-        except ClientError as e:
-            logger.error(f"Secrets Manager error: {e}")
-            raise
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Invalid secret: {e}")
-            raise
+        return self._get("JWT_ALGORITHM")
 
     @property
     def JWT_AUDIENCE(self):
-        try:
-            resp = self._client.get_secret_value(SecretId=self._secret_arn)
-            secret = json.loads(resp["SecretString"])
-            return secret["JWT_AUDIENCE"]
-        except ClientError as e:
-            logger.error(f"Secrets Manager error: {e}")
-            raise
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Invalid secret: {e}")
-            raise
+        return self._get("JWT_AUDIENCE")
 
     @property
     def JWT_ISSUER(self):
-        try:
-            resp = self._client.get_secret_value(SecretId=self._secret_arn)
-            secret = json.loads(resp["SecretString"])
-            return secret["JWT_ISSUER"]
-        except ClientError as e:
-            logger.error(f"Secrets Manager error: {e}")
-            raise
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Invalid secret: {e}")
-            raise
+        return self._get("JWT_ISSUER")
 
     @property
     def REDIS_HOST(self):
-        try:
-            resp = self._client.get_secret_value(SecretId=self._secret_arn)
-            secret = json.loads(resp["SecretString"])
-            return secret["REDIS_HOST"]
-        except ClientError as e:
-            logger.error(f"Secrets Manager error: {e}")
-            raise
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Invalid secret: {e}")
-            raise
+        return self._get("REDIS_HOST")
 
     @property
     def REDIS_PORT(self):
-        try:
-            resp = self._client.get_secret_value(SecretId=self._secret_arn)
-            secret = json.loads(resp["SecretString"])
-            return secret["REDIS_PORT"]
-        except ClientError as e:
-            logger.error(f"Secrets Manager error: {e}")
-            raise
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Invalid secret: {e}")
-            raise
+        return self._get("REDIS_PORT")
 
     @property
     def REDIS_DB(self):
-        try:
-            resp = self._client.get_secret_value(SecretId=self._secret_arn)
-            secret = json.loads(resp["SecretString"])
-            return secret["REDIS_DB"]
-        except ClientError as e:
-            logger.error(f"Secrets Manager error: {e}")
-            raise
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Invalid secret: {e}")
-            raise
+        return self._get("REDIS_DB")
 
     @property
     def AWS_S3_BUCKET(self):
-        try:
-            resp = self._client.get_secret_value(SecretId=self._secret_arn)
-            secret = json.loads(resp["SecretString"])
-            return secret["AWS_S3_BUCKET"]
-        except ClientError as e:
-            logger.error(f"Secrets Manager error: {e}")
-            raise
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Invalid secret: {e}")
-            raise
+        return self._get("AWS_S3_BUCKET")
 
     @property
     def GOOGLE_CLIENT_ID(self):
-        try:
-            resp = self._client.get_secret_value(SecretId=self._secret_arn)
-            secret = json.loads(resp["SecretString"])
-            return secret["GOOGLE_CLIENT_ID"]
-        except ClientError as e:
-            logger.error(f"Secrets Manager error: {e}")
-            raise
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Invalid secret: {e}")
-            raise
+        return self._get("GOOGLE_CLIENT_ID")
 
     @property
     def GOOGLE_CLIENT_SECRET(self):
-        try:
-            resp = self._client.get_secret_value(SecretId=self._secret_arn)
-            secret = json.loads(resp["SecretString"])
-            return secret["GOOGLE_CLIENT_SECRET"]
-        except ClientError as e:
-            logger.error(f"Secrets Manager error: {e}")
-            raise
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Invalid secret: {e}")
-            raise
+        return self._get("GOOGLE_CLIENT_SECRET")
 
     @property
     def GOOGLE_REDIRECT_URI(self):
+        return self._get("GOOGLE_REDIRECT_URI")
+
+    @property
+    def METRICS_TOKEN(self):
+        """Bearer token for GET /metrics; the endpoint is disabled when it is not set."""
         try:
-            resp = self._client.get_secret_value(SecretId=self._secret_arn)
-            secret = json.loads(resp["SecretString"])
-            return secret["GOOGLE_REDIRECT_URI"]
-        except ClientError as e:
-            logger.error(f"Secrets Manager error: {e}")
-            raise
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Invalid secret: {e}")
-            raise
+            return self._secrets.get("METRICS_TOKEN")
+        except KeyError:
+            return None
 
 
 config = AppConfig()
@@ -0,0 +1,78 @@
+import logging
+import threading
+import time
+from typing import Callable, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_registry: list["LazyResource"] = []
+
+
+class LazyResource(Generic[T]):
+    """
+    A process-wide resource that is built on first use instead of at import time.
+
+    Calling the instance returns the resource, creating it under a lock the first time.
+    `reset()` drops it so the next call builds a fresh one (e.g. after a broken connection).
+    """
+
+    def __init__(self, factory: Callable[[], T], name: str | None = None):
+        self._factory = factory
+        self.name = name or factory.__name__
+        self._lock = threading.Lock()
+        self._value: T | None = None
+        self._initialized = False
+        self.init_seconds: float | None = None
+        _registry.append(self)
+
+    def __call__(self) -> T:
+        if self._initialized:
+            return self._value
+        with self._lock:
+            if not self._initialized:
+                start = time.perf_counter()
+                self._value = self._factory()
+                self.init_seconds = time.perf_counter() - start
+                self._initialized = True
+                logger.info(
+                    f"Initialized {self.name} in {self.init_seconds * 1000:.1f}ms"
+                )
+        return self._value
+
+    @property
+    def initialized(self) -> bool:
+        return self._initialized
+
+    def set(self, value: T) -> None:
+        """Install a prebuilt resource instead of calling the factory (scripts, benchmarks)."""
+        with self._lock:
+            self._value = value
+            self._initialized = True
+
+    def reset(self) -> None:
+        """Forget the current resource; the next call builds a new one."""
+        with self._lock:
+            self._value = None
+            self._initialized = False
+
+
+def lazy(factory: Callable[[], T]) -> LazyResource[T]:
+    """Decorator turning a zero-argument factory into a LazyResource."""
+    return LazyResource(factory)
+
+
+def lazy_init_stats() -> dict:
+    """Return which lazy resources have been built and how long each took."""
+    return {
+        resource.name: {
+            "initialized": resource.initialized,
+            "init_ms": (
+                round(resource.init_seconds * 1000, 2)
+                if resource.init_seconds is not None
+                else None
+            ),
+        }
+        for resource in _registry
+    }
@@ -1,19 +1,64 @@
-import redis
 import json
 from datetime import datetime
+
+import redis.asyncio as redis
+
 from .config import config
+from .lazy import LazyResource
 
 
 class RedisClient:
+    """
+    Async Redis client over one shared connection pool.
+
+    Connections are opened on first use and reused by every request; multi-key
+    checks on the hot path are pipelined into a single round trip.
+    """
+
     def __init__(self):
-        self.client = redis.Redis(
+        self._pool = LazyResource(self._create_pool, name="redis_pool")
+        self._client = LazyResource(
+            lambda: redis.Redis(connection_pool=self._pool()), name="redis_client"
+        )
+
+    @staticmethod
+    def _create_pool() -> redis.ConnectionPool:
+        return redis.ConnectionPool(
             host=config.REDIS_HOST,
             port=config.REDIS_PORT,
             db=config.REDIS_DB,
             decode_responses=True,
+            max_connections=config.REDIS_MAX_CONNECTIONS,
+            socket_timeout=config.REDIS_SOCKET_TIMEOUT_SECONDS,
+            socket_connect_timeout=config.REDIS_CONNECT_TIMEOUT_SECONDS,
+            health_check_interval=config.REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
         )
 
-    def store_user_info(self, user_id: str, user_info: dict, ttl_seconds: int = 86400):
+    @property
+    def client(self) -> redis.Redis:
+        """Underlying Redis client, created on first use."""
+        return self._client()
+
+    def pool_stats(self) -> dict:
+        """Return connection counts of the shared pool, if it has been created."""
+        if not self._pool.initialized:
+            return {"created": False}
+        pool = self._pool()
+        stats = {"created": True, "max_connections": pool.max_connections}
+        # Connection lists are private to redis-py; report them only while they exist
+        in_use = getattr(pool, "_in_use_connections", None)
+        available = getattr(pool, "_available_connections", None)
+        if in_use is not None and available is not None:
+            stats.update(
+                in_use=len(in_use),
+                available=len(available),
+                open=len(in_use) + len(available),
+            )
+        return stats
+
+    async def store_user_info(
+        self, user_id: str, user_info: dict, ttl_seconds: int = 86400
+    ):
         """
         Store user information in Redis as JSON with a TTL.
 
@@ -23,9 +68,9 @@ class RedisClient:
             ttl_seconds (int): Time to live in seconds (default: 1 day = 86400).
         """
         key = f"user:{user_id}"
-        self.client.setex(key, ttl_seconds, json.dumps(user_info))
+        await self.client.setex(key, ttl_seconds, json.dumps(user_info))
 
-    def get_user_info(self, user_id: str) -> dict | None:
+    async def get_user_info(self, user_id: str) -> dict | None:
         """
         Retrieve user information from Redis.
 
@@ -36,12 +81,12 @@ class RedisClient:
             dict | None: User data as a dict if found, None otherwise.
         """
         key = f"user:{user_id}"
-        data = self.client.get(key)
+        data = await self.client.get(key)
         if data:
             return json.loads(data)
         return None
 
-    def delete_user_info(self, user_id: str):
+    async def delete_user_info(self, user_id: str):
         """
         Delete user information from Redis.
 
@@ -49,9 +94,11 @@ class RedisClient:
             user_id (str): User ID to delete the info for.
         """
         key = f"user:{user_id}"
-        self.client.delete(key)
+        await self.client.delete(key)
 
-    def store_access_token_jti(self, user_id: str, jti: str, ttl_seconds: int = 86400):
+    async def store_access_token_jti(
+        self, user_id: str, jti: str, ttl_seconds: int = 86400
+    ):
         """
         Store the jti of an access token in Redis with a TTL.
 
@@ -61,9 +108,9 @@ class RedisClient:
             ttl_seconds (int): Time to live in seconds (default: 1 day = 86400).
         """
         key = f"token:jti:{user_id}"
-        self.client.setex(key, ttl_seconds, jti)
+        await self.client.setex(key, ttl_seconds, jti)
 
-    def get_access_token_jti(self, user_id: str) -> str | None:
+    async def get_access_token_jti(self, user_id: str) -> str | None:
         """
         Retrieve the jti of an access token from Redis.
 
@@ -74,9 +121,9 @@ class RedisClient:
             str | None: Stored jti if found, None otherwise.
         """
         key = f"token:jti:{user_id}"
-        return self.client.get(key)
+        return await self.client.get(key)
 
-    def delete_access_token_jti(self, user_id: str):
+    async def delete_access_token_jti(self, user_id: str):
         """
         Delete the jti of an access token from Redis.
 
@@ -84,9 +131,9 @@ class RedisClient:
             user_id (str): User ID to delete the jti for.
         """
         key = f"token:jti:{user_id}"
-        self.client.delete(key)
+        await self.client.delete(key)
 
-    def blacklist_token(self, token: str, expires_at: datetime):
+    async def blacklist_token(self, token: str, expires_at: datetime):
         """
         Blacklist a refresh token with a TTL based on expiration.
 
@@ -96,9 +143,27 @@ class RedisClient:
         """
         ttl = int((expires_at - datetime.utcnow()).total_seconds())
         if ttl > 0:
-            self.client.setex(f"blacklist:{token}", ttl, "blacklisted")
+            await self.client.setex(f"blacklist:{token}", ttl, "blacklisted")
+
+    async def check_access_token(self, user_id: str, jti: str, token: str) -> bool:
+        """
+        Check that an access token is current and not blacklisted, in one round trip.
+
+        Args:
+            user_id (str): User ID the token was issued to.
+            jti (str): The token's unique identifier.
+            token (str): The raw token, checked against the blacklist.
+
+        Returns:
+            bool: True if `jti` is the user's current token and it is not blacklisted.
+        """
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.get(f"token:jti:{user_id}")
+            pipe.exists(f"blacklist:{token}")
+            stored_jti, blacklisted = await pipe.execute()
+        return stored_jti == jti and blacklisted == 0
 
-    def is_token_blacklisted(self, token: str) -> bool:
+    async def is_token_blacklisted(self, token: str) -> bool:
         """
         Check if a refresh token is blacklisted.
 
@@ -108,7 +173,87 @@ class RedisClient:
         Returns:
             bool: True if blacklisted, False otherwise.
         """
-        return self.client.exists(f"blacklist:{token}") == 1
+        return await self.client.exists(f"blacklist:{token}") == 1
+
+    async def get_chat_count(self) -> int | None:
+        """
+        Retrieve the cached total number of chats.
+
+        Returns:
+            int | None: The cached count if present, None otherwise.
+        """
+        count = await self.client.get("chats:count")
+        return int(count) if count is not None else None
+
+    async def store_chat_count(self, count: int, ttl_seconds: int = 300):
+        """
+        Cache the total number of chats with a TTL.
+
+        Args:
+            count (int): Number of chats.
+            ttl_seconds (int): Time to live in seconds (default: 5 minutes).
+        """
+        await self.client.setex("chats:count", ttl_seconds, count)
+
+    async def delete_chat_count(self):
+        """Invalidate the cached total number of chats."""
+        await self.client.delete("chats:count")
+
+    async def store_json(self, key: str, value, ttl_seconds: int):
+        """
+        Store any JSON-serializable value under a key with a TTL.
+
+        Args:
+            key (str): Full Redis key.
+            value: Value to store.
+            ttl_seconds (int): Time to live in seconds.
+        """
+        await self.client.setex(key, ttl_seconds, json.dumps(value))
+
+    async def store_json_many(self, values: dict, ttl_seconds: int):
+        """
+        Store several JSON-serializable values with the same TTL in one round trip.
+
+        Args:
+            values (dict): Value by full Redis key.
+            ttl_seconds (int): Time to live in seconds.
+        """
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.setex(key, ttl_seconds, json.dumps(value))
+            await pipe.execute()
+
+    async def get_json(self, key: str):
+        """
+        Retrieve a value stored with store_json.
+
+        Args:
+            key (str): Full Redis key.
+
+        Returns:
+            The decoded value if found, None otherwise.
+        """
+        data = await self.client.get(key)
+        if data is not None:
+            return json.loads(data)
+        return None
+
+    async def get_json_many(self, keys: list[str]) -> list:
+        """
+        Retrieve several values stored with store_json in one round trip.
+
+        Args:
+            keys (list[str]): Full Redis keys.
+
+        Returns:
+            list: The decoded value per key, None where a key is missing.
+        """
+        if not keys:
+            return []
+        return [
+            json.loads(data) if data is not None else None
+            for data in await self.client.mget(keys)
+        ]
 
 
 redis_client = RedisClient()
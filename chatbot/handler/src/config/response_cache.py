@@ -0,0 +1,112 @@
+import hashlib
+import logging
+import threading
+import uuid
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from config.config import config
+from config.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+CHAT_LIST_SCOPE = "chats"
+
+
+def chat_scope(chat_id: uuid.UUID | str) -> str:
+    return f"chat:{chat_id}"
+
+
+class ResponseCache:
+    """
+    Read-through cache of serialized API responses in Redis.
+
+    Each cached body is stored under its scope's current version (e.g. one chat, or
+    the chat list) plus a hash of the request's query. Writes invalidate a scope by
+    incrementing its version, so stale bodies are never read again and simply expire.
+    Redis failures are logged and the request is served from the database.
+    """
+
+    def __init__(self, prefix: str = "resp"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return config.RESPONSE_CACHE_ENABLED
+
+    async def get(self, scope: str, variant: str) -> tuple[Optional[bytes], str]:
+        """
+        Look up a cached body.
+
+        Args:
+            scope (str): What the response depends on (chat_scope(id) or CHAT_LIST_SCOPE).
+            variant (str): The request's query parameters, in a stable order.
+
+        Returns:
+            tuple: The cached body or None, and the key to store a fresh body under
+            (empty if the cache is disabled or unavailable).
+        """
+        if not self.enabled:
+            return None, ""
+        try:
+            version = await redis_client.client.get(self._version_key(scope)) or "0"
+            digest = hashlib.sha256(variant.encode()).hexdigest()[:32]
+            key = f"{self.prefix}:{scope}:v{version}:{digest}"
+            body = await redis_client.client.get(key)
+        except RedisError as e:
+            logger.warning(f"Response cache read failed: {e}")
+            self._count("errors")
+            return None, ""
+        self._count("hits" if body is not None else "misses")
+        return (body.encode() if body is not None else None), key
+
+    async def set(self, key: str, body: bytes):
+        """Store a serialized body under a key returned by get()."""
+        if not key:
+            return
+        try:
+            await redis_client.client.setex(
+                key, config.RESPONSE_CACHE_TTL_SECONDS, body.decode()
+            )
+        except RedisError as e:
+            logger.warning(f"Response cache write failed: {e}")
+            self._count("errors")
+
+    async def invalidate(self, *scopes: str):
+        """Bump the version of each scope so its cached bodies are no longer read."""
+        if not scopes:
+            return
+        try:
+            async with redis_client.client.pipeline(transaction=False) as pipe:
+                for scope in scopes:
+                    pipe.incr(self._version_key(scope))
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Response cache invalidation failed: {e}")
+            self._count("errors")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+    def _version_key(self, scope: str) -> str:
+        return f"{self.prefix}:ver:{scope}"
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+response_cache = ResponseCache()
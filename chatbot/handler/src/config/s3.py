@@ -1,20 +1,244 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 from fastapi import HTTPException, UploadFile
+from redis.exceptions import RedisError
 
+from config.cache import TTLCache
 from config.config import config  # Import the config object
+from config.lazy import lazy
+from config.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+@lazy
+def get_s3_client() -> boto3.client:
+    """
+    Return the configured S3 client for advanced usage if needed.
+    The client is created on first use.
+    """
+    return boto3.client(
+        "s3",
+    )
+
+
+@lazy
+def get_transfer_config() -> TransferConfig:
+    """Multipart settings: large files are sent as parts, several at a time."""
+    return TransferConfig(
+        multipart_threshold=config.S3_MULTIPART_THRESHOLD_BYTES,
+        multipart_chunksize=config.S3_MULTIPART_CHUNKSIZE_BYTES,
+        max_concurrency=config.S3_MULTIPART_MAX_CONCURRENCY,
+    )
+
+
+@lazy
+def get_upload_executor() -> ThreadPoolExecutor:
+    """Bounded pool that runs blocking uploads off the event loop."""
+    return ThreadPoolExecutor(
+        max_workers=config.S3_UPLOAD_MAX_WORKERS, thread_name_prefix="s3-upload"
+    )
+
+
+class UploadStats:
+    """Upload counters and the timing of the most recent uploads."""
+
+    def __init__(self, recent: int = 20):
+        self._lock = threading.Lock()
+        self.uploads = 0
+        self.errors = 0
+        self.bytes = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.recent = deque(maxlen=recent)
+
+    def record(self, size: int, seconds: float, ok: bool):
+        with self._lock:
+            if ok:
+                self.uploads += 1
+                self.bytes += size
+                self.total_seconds += seconds
+                self.max_seconds = max(self.max_seconds, seconds)
+            else:
+                self.errors += 1
+            # Object keys contain user file names and are not exposed
+            self.recent.append(
+                {
+                    "bytes": size,
+                    "ms": round(seconds * 1000, 2),
+                    "ok": ok,
+                }
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "uploads": self.uploads,
+                "errors": self.errors,
+                "bytes": self.bytes,
+                "avg_ms": (
+                    round(self.total_seconds * 1000 / self.uploads, 2)
+                    if self.uploads
+                    else None
+                ),
+                "max_ms": round(self.max_seconds * 1000, 2),
+                "recent": list(self.recent),
+            }
+
+
+upload_stats = UploadStats()
+
+
+class PresignedUrlCache:
+    """
+    Cache of presigned GET URLs keyed by (bucket, key, expires_in).
+
+    A URL is reused only while at least `min_remaining_ratio` of its lifetime is
+    left, so every URL handed out stays valid for a useful time; after that the
+    object is signed again. Entries live in an in-process LRU and, when enabled and
+    used from async code, in Redis so other instances can reuse them.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        min_remaining_ratio: float = 0.5,
+        use_redis: bool = False,
+    ):
+        self.local = TTLCache(max_entries=max_entries)
+        self.min_remaining_ratio = min_remaining_ratio
+        self.use_redis = use_redis
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def reuse_seconds(self, expires_in: int) -> float:
+        """How long after signing a URL may still be handed out."""
+        return expires_in * (1 - self.min_remaining_ratio)
+
+    def get_many(self, bucket: str, file_keys: list[str], expires_in: int) -> dict:
+        """Return the cached URL for each key that has a reusable one (local tier)."""
+        found, _ = self._get_local(bucket, file_keys, expires_in)
+        self._count(len(found), 0, len(file_keys) - len(found))
+        return found
+
+    async def aget_many(
+        self, bucket: str, file_keys: list[str], expires_in: int
+    ) -> dict:
+        """Like get_many, also looking up local misses in Redis when enabled."""
+        found, missing = self._get_local(bucket, file_keys, expires_in)
+        local_hits = len(found)
+
+        if missing and self.use_redis:
+            try:
+                entries = await redis_client.get_json_many(
+                    [self._redis_key(bucket, k, expires_in) for k in missing]
+                )
+            except RedisError as e:
+                logger.warning(f"Presigned URL cache read failed: {e}")
+                entries = []
+            now = time.time()
+            for file_key, entry in zip(missing, entries):
+                if entry and entry["reuse_until"] > now:
+                    found[file_key] = entry["url"]
+                    self.local.set(
+                        (bucket, file_key, expires_in),
+                        entry["url"],
+                        entry["reuse_until"] - now,
+                    )
+
+        self._count(local_hits, len(found) - local_hits, len(file_keys) - len(found))
+        return found
+
+    def put_many(self, bucket: str, urls: dict[str, str], expires_in: int):
+        """Cache URLs that were just signed (local tier)."""
+        reuse_seconds = self.reuse_seconds(expires_in)
+        if reuse_seconds <= 0:
+            return
+        for file_key, url in urls.items():
+            self.local.set((bucket, file_key, expires_in), url, reuse_seconds)
+
+    async def aput_many(self, bucket: str, urls: dict[str, str], expires_in: int):
+        """Like put_many, also sharing the URLs through Redis when enabled."""
+        self.put_many(bucket, urls, expires_in)
+        await self.ashare_many(bucket, urls, expires_in)
 
-# Initialize S3 client using config values
-s3_client = boto3.client(
-    "s3",
-)
+    async def ashare_many(self, bucket: str, urls: dict[str, str], expires_in: int):
+        """Share URLs through Redis when enabled, without writing the local tier."""
+        reuse_seconds = self.reuse_seconds(expires_in)
+        if not (self.use_redis and urls and reuse_seconds > 0):
+            return
+        reuse_until = time.time() + reuse_seconds
+        try:
+            await redis_client.store_json_many(
+                {
+                    self._redis_key(bucket, file_key, expires_in): {
+                        "url": url,
+                        "reuse_until": reuse_until,
+                    }
+                    for file_key, url in urls.items()
+                },
+                int(reuse_seconds),
+            )
+        except RedisError as e:
+            logger.warning(f"Presigned URL cache write failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "local_hits": self.local_hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "local_entries": len(self.local),
+            }
+
+    def _get_local(
+        self, bucket: str, file_keys: list[str], expires_in: int
+    ) -> tuple[dict, list]:
+        found = {}
+        missing = []
+        for file_key in file_keys:
+            url = self.local.get((bucket, file_key, expires_in))
+            if url is not None:
+                found[file_key] = url
+            else:
+                missing.append(file_key)
+        return found, missing
+
+    def _count(self, local_hits: int, redis_hits: int, misses: int):
+        with self._lock:
+            self.local_hits += local_hits
+            self.redis_hits += redis_hits
+            self.misses += misses
+
+    @staticmethod
+    def _redis_key(bucket: str, file_key: str, expires_in: int) -> str:
+        return f"presign:{bucket}:{expires_in}:{file_key}"
+
+
+@lazy
+def get_presigned_url_cache() -> PresignedUrlCache:
+    return PresignedUrlCache(
+        max_entries=config.PRESIGN_CACHE_MAX_ENTRIES,
+        min_remaining_ratio=config.PRESIGN_CACHE_MIN_REMAINING_RATIO,
+        use_redis=config.PRESIGN_CACHE_REDIS,
+    )
 
 
 def upload_to_s3(
     file: UploadFile, folder: str = "uploads", expires_in: int = 3600
-) -> str:
+) -> tuple[str, str]:
     """
-    Upload a file to a private S3 bucket and return a presigned URL for access.
+    Upload a file to a private S3 bucket and return its key and a presigned URL for access.
 
     Args:
         file (UploadFile): The file to upload (from FastAPI).
@@ -22,30 +246,38 @@ def upload_to_s3(
         expires_in (int): Expiration time in seconds for the presigned URL (default: 1 hour).
 
     Returns:
-        str: A presigned URL for temporary access to the uploaded file.
+        tuple[str, str]: The S3 key of the uploaded file and a presigned URL for
+            temporary access to it.
 
     Raises:
         HTTPException: If the upload or URL generation fails.
     """
+    # Generate a unique key (e.g., uploads/filename)
+    file_key = f"{folder}/{file.filename}"
+    start = time.perf_counter()
+    ok = False
     try:
-        # Generate a unique key (e.g., uploads/filename)
-        file_key = f"{folder}/{file.filename}"
-
         # Upload the file to the private bucket
-        s3_client.upload_fileobj(
+        get_s3_client().upload_fileobj(
             file.file,  # File object from UploadFile
             config.AWS_S3_BUCKET,
             file_key,
             ExtraArgs={"ContentType": file.content_type},  # Set MIME type
+            Config=get_transfer_config(),
         )
+        ok = True
 
         # Generate a presigned URL for temporary access
-        file_url = s3_client.generate_presigned_url(
+        file_url = get_s3_client().generate_presigned_url(
             "get_object",
             Params={"Bucket": config.AWS_S3_BUCKET, "Key": file_key},
             ExpiresIn=expires_in,
         )
-        return file_url
+        # Seed the cache so the next read of this file reuses the URL
+        get_presigned_url_cache().put_many(
+            config.AWS_S3_BUCKET, {file_key: file_url}, expires_in
+        )
+        return file_key, file_url
 
     except ClientError as e:
         raise HTTPException(
@@ -56,13 +288,33 @@ def upload_to_s3(
         raise HTTPException(
             status_code=500, detail=f"Unexpected error during S3 upload: {str(e)}"
         )
+    finally:
+        elapsed = time.perf_counter() - start
+        upload_stats.record(file.size or 0, elapsed, ok)
+        logger.info(
+            f"S3 upload {file_key} ({file.size} bytes) "
+            f"{'done' if ok else 'failed'} in {elapsed * 1000:.1f}ms"
+        )
 
 
-def get_s3_client() -> boto3.client:
+async def aupload_to_s3(
+    file: UploadFile, folder: str = "uploads", expires_in: int = 3600
+) -> tuple[str, str]:
     """
-    Return the configured S3 client for advanced usage if needed.
+    Async version of upload_to_s3.
+
+    The blocking boto3 upload runs in a bounded thread pool, so the event loop keeps
+    serving other requests meanwhile.
     """
-    return s3_client
+    loop = asyncio.get_running_loop()
+    file_key, file_url = await loop.run_in_executor(
+        get_upload_executor(), upload_to_s3, file, folder, expires_in
+    )
+    # upload_to_s3 has seeded the local tier already
+    await get_presigned_url_cache().ashare_many(
+        config.AWS_S3_BUCKET, {file_key: file_url}, expires_in
+    )
+    return file_key, file_url
 
 
 def generate_presigned_url(file_key: str, expires_in: int = 3600) -> str:
@@ -76,14 +328,65 @@ def generate_presigned_url(file_key: str, expires_in: int = 3600) -> str:
     Returns:
         str: A presigned URL for temporary access.
     """
+    return generate_presigned_urls([file_key], expires_in)[file_key]
+
+
+def _sign_urls(bucket: str, file_keys: list[str], expires_in: int) -> dict[str, str]:
+    client = get_s3_client()
     try:
-        url = s3_client.generate_presigned_url(
-            "get_object",
-            Params={"Bucket": config.AWS_S3_BUCKET, "Key": file_key},
-            ExpiresIn=expires_in,
-        )
-        return url
+        return {
+            file_key: client.generate_presigned_url(
+                "get_object",
+                Params={"Bucket": bucket, "Key": file_key},
+                ExpiresIn=expires_in,
+            )
+            for file_key in file_keys
+        }
     except ClientError as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to generate presigned URL: {str(e)}"
         )
+
+
+def generate_presigned_urls(
+    file_keys: list[str], expires_in: int = 3600
+) -> dict[str, str]:
+    """
+    Generate presigned URLs for several existing S3 objects in one pass.
+
+    URLs that are cached with enough lifetime left are reused; the remaining keys
+    are signed with one client, each distinct key once.
+
+    Args:
+        file_keys (list[str]): S3 keys to sign; duplicates are signed once.
+        expires_in (int): Expiration time in seconds (default: 1 hour).
+
+    Returns:
+        dict[str, str]: Presigned URL by S3 key.
+    """
+    bucket = config.AWS_S3_BUCKET
+    cache = get_presigned_url_cache()
+    file_keys = list(dict.fromkeys(file_keys))
+    urls = cache.get_many(bucket, file_keys, expires_in)
+    missing = [file_key for file_key in file_keys if file_key not in urls]
+    if missing:
+        signed = _sign_urls(bucket, missing, expires_in)
+        cache.put_many(bucket, signed, expires_in)
+        urls.update(signed)
+    return urls
+
+
+async def agenerate_presigned_urls(
+    file_keys: list[str], expires_in: int = 3600
+) -> dict[str, str]:
+    """Async version of generate_presigned_urls that also uses the Redis tier."""
+    bucket = config.AWS_S3_BUCKET
+    cache = get_presigned_url_cache()
+    file_keys = list(dict.fromkeys(file_keys))
+    urls = await cache.aget_many(bucket, file_keys, expires_in)
+    missing = [file_key for file_key in file_keys if file_key not in urls]
+    if missing:
+        signed = _sign_urls(bucket, missing, expires_in)
+        await cache.aput_many(bucket, signed, expires_in)
+        urls.update(signed)
+    return urls
@@ -0,0 +1,160 @@
+import json
+import logging
+import threading
+import time
+from typing import Callable
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+
+class SecretCache:
+    """
+    In-process cache for a JSON secret stored in AWS Secrets Manager.
+
+    The whole secret is fetched once and every key is served from memory. Once the
+    cached value is older than `refresh_after` seconds it is still served, while a
+    background thread re-fetches it so rotated values are picked up without blocking
+    callers. After `ttl_seconds` the next read refreshes synchronously.
+    """
+
+    def __init__(
+        self,
+        get_client: Callable,
+        secret_id: str,
+        ttl_seconds: float = 300,
+        refresh_ratio: float = 0.8,
+    ):
+        """
+        Args:
+            get_client (Callable): Returns the boto3 Secrets Manager client; called on
+                first fetch so the client is not built at import time.
+            secret_id (str): ARN or name of the secret.
+            ttl_seconds (float): Maximum age of a cached secret (default: 5 minutes).
+            refresh_ratio (float): Fraction of the TTL after which a background refresh
+                is started (default: 0.8).
+        """
+        self._get_client = get_client
+        self._secret_id = secret_id
+        self.ttl_seconds = ttl_seconds
+        self.refresh_after = ttl_seconds * refresh_ratio
+
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._secret: dict | None = None
+        self._fetched_at = 0.0
+        self._refreshing = False
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.fetch_errors = 0
+        self.total_fetch_seconds = 0.0
+        self.last_fetch_seconds: float | None = None
+
+    def get(self, key: str):
+        """
+        Return a single value from the secret.
+
+        Raises:
+            KeyError: If the key is not present in the secret.
+        """
+        return self._get_secret()[key]
+
+    def refresh(self) -> dict:
+        """Fetch the secret from Secrets Manager now and replace the cached copy."""
+        with self._fetch_lock:
+            return self._fetch()
+
+    def stats(self) -> dict:
+        """Return cache counters and fetch latency."""
+        with self._lock:
+            fetches = self.fetches
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "fetches": fetches,
+                "fetch_errors": self.fetch_errors,
+                "last_fetch_ms": (
+                    round(self.last_fetch_seconds * 1000, 2)
+                    if self.last_fetch_seconds is not None
+                    else None
+                ),
+                "avg_fetch_ms": (
+                    round(self.total_fetch_seconds * 1000 / fetches, 2)
+                    if fetches
+                    else None
+                ),
+                "age_seconds": (
+                    round(time.monotonic() - self._fetched_at, 2)
+                    if self._secret is not None
+                    else None
+                ),
+            }
+
+    def _get_secret(self) -> dict:
+        start_refresh = False
+        with self._lock:
+            secret = self._secret
+            age = time.monotonic() - self._fetched_at
+            if secret is not None and age < self.ttl_seconds:
+                self.hits += 1
+                if age >= self.refresh_after and not self._refreshing:
+                    self._refreshing = True
+                    start_refresh = True
+            else:
+                self.misses += 1
+                secret = None
+
+        if start_refresh:
+            threading.Thread(target=self._background_refresh, daemon=True).start()
+        if secret is not None:
+            return secret
+
+        with self._fetch_lock:
+            # Another caller may have fetched while we were waiting for the lock
+            with self._lock:
+                if (
+                    self._secret is not None
+                    and time.monotonic() - self._fetched_at < self.ttl_seconds
+                ):
+                    return self._secret
+            return self._fetch()
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning(
+                f"Background secret refresh failed, serving cached value: {e}"
+            )
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _fetch(self) -> dict:
+        start = time.perf_counter()
+        try:
+            resp = self._get_client().get_secret_value(SecretId=self._secret_id)
+            secret = json.loads(resp["SecretString"])
+        except ClientError as e:
+            with self._lock:
+                self.fetch_errors += 1
+            logger.error(f"Secrets Manager error: {e}")
+            raise
+        except (json.JSONDecodeError, KeyError) as e:
+            with self._lock:
+                self.fetch_errors += 1
+            logger.error(f"Invalid secret: {e}")
+            raise
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self._secret = secret
+            self._fetched_at = time.monotonic()
+            self.fetches += 1
+            self.total_fetch_seconds += elapsed
+            self.last_fetch_seconds = elapsed
+        return secret
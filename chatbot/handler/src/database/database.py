@@ -1,27 +1,152 @@
+import asyncio
 import logging
+from urllib.parse import unquote, urlsplit
 
-import psycopg
-from langchain_postgres import PostgresChatMessageHistory
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
 from sqlalchemy import create_engine, inspect
 from sqlalchemy.sql import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from config.config import config
+from config.lazy import lazy
 
 # pull in your existing logger or create one
 logger = logging.getLogger(__name__)
 
-DATABASE_URL = config.DATABASE_URL
-engine = create_engine("postgresql+psycopg://" + DATABASE_URL, echo=True, future=True)
-sync_connection = psycopg.connect(conninfo="postgresql://" + DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Changes to existing tables that create_all() does not apply; each must be idempotent
+SCHEMA_UPGRADES = [
+    "ALTER TABLE files ADD COLUMN IF NOT EXISTS s3_key VARCHAR",
+    "CREATE INDEX IF NOT EXISTS ix_messages_chat_id_created_at_id "
+    "ON messages (chat_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_chats_created_at_id ON chats (created_at, id)",
+    # Tail reads of a session's chat history
+    "CREATE INDEX IF NOT EXISTS idx_chat_history_session_id_id "
+    "ON chat_history (session_id, id)",
+]
 
-def get_db():
-    """FastAPI dependency: create a new DB session per request and close it."""
-    db = SessionLocal()
+
+def s3_key_from_url(file_url: str) -> str:
+    """Return the object key of a presigned S3 URL, whose path is percent-encoded."""
+    return unquote(urlsplit(file_url).path.lstrip("/"))
+
+
+def backfill_s3_keys(conn) -> int:
+    """Set s3_key for files stored before the column existed, from their stored URL."""
+    rows = conn.execute(
+        text("SELECT id, file_url FROM files WHERE s3_key IS NULL")
+    ).all()
+    if rows:
+        conn.execute(
+            text("UPDATE files SET s3_key = :s3_key WHERE id = :id"),
+            [
+                {"id": file_id, "s3_key": s3_key_from_url(file_url)}
+                for file_id, file_url in rows
+            ],
+        )
+    return len(rows)
+
+
+@lazy
+def get_engine():
+    """Sync SQLAlchemy engine for scripts and migrations, created on first use."""
+    return create_engine(
+        "postgresql+psycopg://" + config.DATABASE_URL, echo=True, future=True
+    )
+
+
+def _history_pool_kwargs() -> dict:
+    return {
+        "conninfo": "postgresql://" + config.DATABASE_URL,
+        "min_size": config.HISTORY_POOL_MIN_SIZE,
+        "max_size": config.HISTORY_POOL_MAX_SIZE,
+        "max_lifetime": config.HISTORY_POOL_MAX_LIFETIME,
+        "max_idle": config.HISTORY_POOL_MAX_IDLE,
+        "timeout": config.HISTORY_POOL_TIMEOUT,
+    }
+
+
+@lazy
+def get_history_pool() -> ConnectionPool:
+    """Sync psycopg pool for chat history, used by scripts and migrations."""
+    return ConnectionPool(
+        **_history_pool_kwargs(),
+        check=ConnectionPool.check_connection,
+        name="chat_history",
+        open=True,
+    )
+
+
+_async_history_pool: AsyncConnectionPool | None = None
+_async_history_pool_lock = asyncio.Lock()
+
+
+async def get_async_history_pool() -> AsyncConnectionPool:
+    """
+    Async psycopg pool used by the agent for PostgresChatMessageHistory.
+
+    Opened on first use, since an async pool needs a running event loop. Connections
+    are health-checked on checkout and recycled after HISTORY_POOL_MAX_LIFETIME.
+    """
+    global _async_history_pool
+    if _async_history_pool is None:
+        async with _async_history_pool_lock:
+            if _async_history_pool is None:
+                pool = AsyncConnectionPool(
+                    **_history_pool_kwargs(),
+                    check=AsyncConnectionPool.check_connection,
+                    name="chat_history_async",
+                    open=False,
+                )
+                await pool.open()
+                _async_history_pool = pool
+    return _async_history_pool
+
+
+def history_pool_stats() -> dict:
+    """Return psycopg pool statistics for the chat history pools that are open."""
+    stats = {}
+    if get_history_pool.initialized:
+        stats["sync"] = get_history_pool().get_stats()
+    if _async_history_pool is not None:
+        stats["async"] = _async_history_pool.get_stats()
+    return stats
+
+
+@lazy
+def get_async_engine():
+    """Async SQLAlchemy engine (psycopg async mode) used by the API, created on first use."""
+    return create_async_engine(
+        "postgresql+psycopg://" + config.DATABASE_URL, echo=True, future=True
+    )
+
+
+@lazy
+def get_session_factory():
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+
+
+@lazy
+def get_async_session_factory():
+    # expire_on_commit=False: attributes stay readable after commit without an
+    # implicit (and, under asyncio, illegal) lazy refresh
+    return async_sessionmaker(
+        autoflush=False, expire_on_commit=False, bind=get_async_engine()
+    )
+
+
+async def get_db():
+    """FastAPI dependency: create a new async DB session per request and close it."""
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+def get_sync_db():
+    """Sync counterpart of get_db for scripts: yields a blocking Session and closes it."""
+    db = get_session_factory()()
     try:
         yield db
     finally:
@@ -31,7 +156,7 @@ def get_db():
 def check_db_connection():
     """Verify we can connect and run a simple query."""
     try:
-        with engine.connect() as conn:
+        with get_engine().connect() as conn:
             conn.execute(text("SELECT 1"))
         return {"status": "success", "detail": "Database connection OK"}
     except Exception as e:
@@ -40,7 +165,7 @@ def check_db_connection():
 
 def list_tables():
     """List all tables in the public schema."""
-    inspector = inspect(engine)
+    inspector = inspect(get_engine())
     tables = inspector.get_table_names(schema="public")
     return {"tables": tables}
 
@@ -51,11 +176,19 @@ def migrate_db():
     Accepts an optional Session for signature consistency.
     """
     try:
+        from langchain_postgres import PostgresChatMessageHistory
+
         # import all models so they're registered on Base.metadata
         from database import models
 
-        Base.metadata.create_all(bind=engine)
-        PostgresChatMessageHistory.create_tables(sync_connection, "chat_history")
+        Base.metadata.create_all(bind=get_engine())
+        with get_history_pool().connection() as conn:
+            PostgresChatMessageHistory.create_tables(conn, "chat_history")
+        with get_engine().begin() as conn:
+            for statement in SCHEMA_UPGRADES:
+                conn.execute(text(statement))
+            backfilled = backfill_s3_keys(conn)
+        logger.info(f"Backfilled s3_key for {backfilled} files")
         logger.info("Database migrations applied successfully")
         return {"status": "success", "detail": "Migrations applied"}
     except Exception as e:
@@ -9,6 +9,8 @@ from sqlalchemy import (
     ForeignKey,
     Enum,
     JSON,
+    Text,
+    Index,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -38,6 +40,9 @@ class Chat(Base):
     messages = relationship("Message", back_populates="chat")
     tags = relationship("Tag", secondary="chat_tags", back_populates="chats")
 
+    # Keyset pagination of the chat list
+    __table_args__ = (Index("ix_chats_created_at_id", "created_at", "id"),)
+
 
 class Message(Base):
     __tablename__ = "messages"
@@ -60,11 +65,17 @@ class Message(Base):
     chat = relationship("Chat", back_populates="messages")
     file = relationship("File", foreign_keys=[file_id])
 
+    # Keyset pagination of a chat's messages
+    __table_args__ = (
+        Index("ix_messages_chat_id_created_at_id", "chat_id", "created_at", "id"),
+    )
+
 
 class File(Base):
     __tablename__ = "files"  # Renamed from "attachments"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     file_url = Column(String, nullable=False)  # URL to the file in external storage
+    s3_key = Column(String, nullable=True)  # Object key in the handler bucket
     file_type = Column(String, nullable=True)  # e.g., "image/jpeg", "application/pdf"
     file_size = Column(Integer, nullable=True)  # Size in bytes
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -82,6 +93,16 @@ class Tag(Base):
     chats = relationship("Chat", secondary="chat_tags", back_populates="tags")
 
 
+class ChatSummary(Base):
+    __tablename__ = "chat_summaries"
+    # Session of the chat_history table (the agent's conversation)
+    session_id = Column(UUID(as_uuid=True), primary_key=True)
+    summary = Column(Text, nullable=False)
+    # chat_history.id of the last message folded into the summary
+    summarized_through_id = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
 class ChatTag(Base):
     __tablename__ = "chat_tags"
     chat_id = Column(UUID(as_uuid=True), ForeignKey("chats.id"), primary_key=True)
@@ -1,11 +1,21 @@
+import hmac
 import logging
 import sys
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Header, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 
+from config.config import config
+from config import s3
+from config.lazy import lazy_init_stats
+from config.redis_client import redis_client
+from config.response_cache import response_cache
 from database import database
 from routes.v1 import api_v1
+from services.agent.search_clients import search_client_stats
+from services.agent.context import context_stats
+from services.agent.semantic_cache import semantic_cache_stats
+from services.agent.tool_cache import tool_result_cache
 
 # Configure logging for Lambda with explicit CloudWatch compatibility
 logging.basicConfig(
@@ -22,7 +32,7 @@ logger.setLevel(logging.INFO)  # Explicitly set to INFO
 # FastAPI app
 app = FastAPI(title="Handler Service")
 
-database.migrate_db()
+# Migrations are applied out of the request path, see migrate.py
 
 app.mount("/api/v1", api_v1)
 
@@ -56,3 +66,39 @@ def migrate():
     """Run migrations."""
     database.migrate_db()
     return {"status": "ok", "message": "Migrations applied."}
+
+
+def require_metrics_token(authorization: str | None = Header(None)):
+    """Allow only requests carrying the METRICS_TOKEN secret as a bearer token."""
+    token = config.METRICS_TOKEN
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Metrics are disabled"
+        )
+    scheme, _, credentials = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(
+        credentials.encode(), str(token).encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@app.get("/metrics", dependencies=[Depends(require_metrics_token)])
+def metrics():
+    """In-process cache and client statistics (requires the metrics bearer token)."""
+    return {
+        "secrets": config.secret_stats(),
+        "lazy_init": lazy_init_stats(),
+        "history_pool": database.history_pool_stats(),
+        "tool_cache": tool_result_cache.stats(),
+        "search_clients": search_client_stats(),
+        "s3_uploads": s3.upload_stats.stats(),
+        "presigned_urls": s3.get_presigned_url_cache().stats(),
+        "redis_pool": redis_client.pool_stats(),
+        "response_cache": response_cache.stats(),
+        "semantic_cache": semantic_cache_stats(),
+        "history_context": context_stats.stats(),
+    }
@@ -0,0 +1,29 @@
+"""
+Apply database migrations outside the request path.
+
+Run locally with `python src/migrate.py`, or invoke the `-migrate` Lambda function,
+which uses this module's `handler` as its entry point, once per release.
+"""
+
+import logging
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import database
+
+logger = logging.getLogger(__name__)
+
+
+def handler(event, context):
+    """Lambda entry point: apply migrations and return the result."""
+    result = database.migrate_db()
+    logger.info(f"Migration result: {result}")
+    return result
+
+
+if __name__ == "__main__":
+    result = database.migrate_db()
+    print(result)
+    sys.exit(0 if result["status"] == "success" else 1)
@@ -1,60 +1,115 @@
+import logging
 import uuid
-from typing import List
+from typing import List, Tuple
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from config.redis_client import redis_client
+from config.response_cache import CHAT_LIST_SCOPE, chat_scope, response_cache
 from database.database import get_db
 from database.models import Chat
+from repositories.cursor import fetch_page
 
+logger = logging.getLogger(__name__)
 
-def get_chat_repository(db: Session = Depends(get_db)):
+
+def get_chat_repository(db: AsyncSession = Depends(get_db)):
     return ChatRepository(db)
 
 
 class ChatRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create_chat(self, title: str = None) -> Chat:
+    async def create_chat(self, title: str = None) -> Chat:
         chat = Chat(id=uuid.uuid4(), title=title)
         self.db.add(chat)
-        self.db.commit()
-        self.db.refresh(chat)
+        await self.db.commit()
+        await self.db.refresh(chat)
+        await self._invalidate_count()
+        await response_cache.invalidate(CHAT_LIST_SCOPE)
         return chat
 
-    def update_chat(self, chat_id: uuid.UUID, title: str) -> Chat | None:
+    async def update_chat(self, chat_id: uuid.UUID, title: str) -> Chat | None:
         """Update the title of a chat."""
-        chat = self.db.query(Chat).filter(Chat.id == chat_id).first()
+        chat = await self.db.get(Chat, chat_id)
         if not chat:
             return None
         chat.title = title
-        self.db.commit()
-        self.db.refresh(chat)
+        await self.db.commit()
+        await self.db.refresh(chat)
+        await response_cache.invalidate(chat_scope(chat_id), CHAT_LIST_SCOPE)
         return chat
 
-    def get_chats_by_user(self, limit: int = 50, offset: int = 0) -> List[Chat]:
+    async def get_chats_by_user(self, limit: int = 50, offset: int = 0) -> List[Chat]:
         """List chats for a user with pagination."""
-        return (
-            self.db.query(Chat)
-            .order_by(Chat.created_at.desc())
-            .offset(offset)
-            .limit(limit)
-            .all()
+        result = await self.db.scalars(
+            select(Chat).order_by(Chat.created_at.desc()).offset(offset).limit(limit)
         )
+        return list(result.all())
+
+    async def get_chats_page(
+        self, limit: int = 50, cursor: str = None
+    ) -> Tuple[List[Chat], str | None, str | None]:
+        """
+        List chats newest first using keyset pagination on (created_at, id).
+
+        Args:
+            limit (int): Maximum number of chats to return.
+            cursor (str): A next/prev cursor from a previous page; None for the first page.
 
-    def count_chats_by_user(self) -> int:
-        """Count the total number of chats for a user."""
-        return self.db.query(Chat).count()
+        Returns:
+            tuple: The chats, the cursor for the next (older) page or None and the
+                cursor for the previous (newer) page or None.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        return await fetch_page(
+            self.db, select(Chat), Chat, limit, cursor, newest_first=True
+        )
 
-    def get_chat_by_id(self, chat_id: uuid.UUID) -> Chat | None:
+    async def count_chats_by_user(self) -> int:
+        """
+        Count the total number of chats for a user.
+
+        The count is cached in Redis and invalidated when a chat is created or
+        deleted; if Redis is unavailable the database is counted directly.
+        """
+        try:
+            cached = await redis_client.get_chat_count()
+            if cached is not None:
+                return cached
+        except RedisError as e:
+            logger.warning(f"Chat count cache unavailable: {e}")
+
+        count = await self.db.scalar(select(func.count()).select_from(Chat))
+        try:
+            await redis_client.store_chat_count(count)
+        except RedisError as e:
+            logger.warning(f"Failed to cache chat count: {e}")
+        return count
+
+    async def get_chat_by_id(self, chat_id: uuid.UUID) -> Chat | None:
         """Retrieve a specific chat by ID, ensuring it belongs to the user."""
-        return self.db.query(Chat).filter(Chat.id == chat_id).first()
+        return await self.db.get(Chat, chat_id)
 
-    def delete_chat(self, chat_id: uuid.UUID) -> bool:
+    async def delete_chat(self, chat_id: uuid.UUID) -> bool:
         """Delete a chat by ID, ensuring it belongs to the user."""
-        chat = self.db.query(Chat).filter(Chat.id == chat_id).first()
+        chat = await self.db.get(Chat, chat_id)
         if not chat:
             return False
-        self.db.delete(chat)
-        self.db.commit()
+        await self.db.delete(chat)
+        await self.db.commit()
+        await self._invalidate_count()
+        await response_cache.invalidate(chat_scope(chat_id), CHAT_LIST_SCOPE)
         return True
+
+    @staticmethod
+    async def _invalidate_count():
+        try:
+            await redis_client.delete_chat_count()
+        except RedisError as e:
+            logger.warning(f"Failed to invalidate chat count: {e}")
@@ -0,0 +1,111 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, List, Literal, Optional, Tuple
+
+from sqlalchemy import Select, asc, desc, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+Direction = Literal["next", "prev"]
+
+
+def encode_cursor(created_at: datetime, row_id: uuid.UUID, direction: Direction) -> str:
+    """
+    Encode a keyset position as an opaque, URL-safe cursor.
+
+    Args:
+        created_at (datetime): created_at of the row the cursor points at.
+        row_id (uuid.UUID): id of that row, used as the tie-breaker.
+        direction (Direction): "next" for rows after the position, "prev" for rows before it.
+    """
+    payload = json.dumps(
+        {"t": created_at.isoformat(), "id": str(row_id), "d": direction},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID, Direction]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = payload["d"]
+        if direction not in ("next", "prev"):
+            raise ValueError(f"unknown direction {direction!r}")
+        return datetime.fromisoformat(payload["t"]), uuid.UUID(payload["id"]), direction
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+
+
+async def fetch_page(
+    db: AsyncSession,
+    query: Select,
+    model: Any,
+    limit: int,
+    cursor: Optional[str] = None,
+    newest_first: bool = False,
+) -> Tuple[List[Any], str | None, str | None]:
+    """
+    Fetch one page of `query` using keyset pagination on (created_at, id).
+
+    The position is served by an index ending in (created_at, id), so every page
+    costs the same however deep it is.
+
+    Args:
+        db (AsyncSession): The session to query.
+        query (Select): A select of `model`, already filtered (e.g. to one chat).
+        model: The mapped class; it must have `created_at` and `id` columns.
+        limit (int): Maximum number of rows to return.
+        cursor (str): A next/prev cursor from a previous page; None for the first page.
+        newest_first (bool): Order pages by descending (created_at, id).
+
+    Returns:
+        tuple: The rows in page order, the cursor for the following page (or None)
+            and the cursor for the preceding page (or None).
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    direction = "next"
+    if cursor:
+        created_at, row_id, direction = decode_cursor(cursor)
+    # Rows are read moving away from the cursor; "prev" pages are read backwards
+    ascending = (direction == "next") != newest_first
+    position = tuple_(model.created_at, model.id)
+    if cursor:
+        bound = tuple_(created_at, row_id)
+        query = query.where(position > bound if ascending else position < bound)
+    order = asc if ascending else desc
+    query = query.order_by(order(model.created_at), order(model.id))
+
+    # Fetch one extra row to learn whether another page exists
+    rows = list((await db.scalars(query.limit(limit + 1))).all())
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == "prev":
+        rows.reverse()
+
+    if not rows:
+        if not cursor:
+            return [], None, None
+        # Nothing is left on this side of the position (e.g. the rows were deleted);
+        # point back at it so the client can still page the other way
+        if direction == "next":
+            return [], None, encode_cursor(created_at, row_id, "prev")
+        return [], encode_cursor(created_at, row_id, "next"), None
+
+    first, last = rows[0], rows[-1]
+    has_next = has_more if direction == "next" else True
+    has_previous = has_more if direction == "prev" else cursor is not None
+    next_cursor = encode_cursor(last.created_at, last.id, "next") if has_next else None
+    prev_cursor = (
+        encode_cursor(first.created_at, first.id, "prev") if has_previous else None
+    )
+    return rows, next_cursor, prev_cursor
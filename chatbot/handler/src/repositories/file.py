@@ -1,35 +1,39 @@
 import uuid
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.database import get_db
 from database.models import File
 
 
-def get_file_repository(db: Session = Depends(get_db)):
+def get_file_repository(db: AsyncSession = Depends(get_db)):
     return FileRepository(db)
 
 
 class FileRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create_file(
-        self, file_url: str, file_type: str = None, file_size: int = None
+    async def create_file(
+        self,
+        s3_key: str,
+        file_url: str,
+        file_type: str = None,
+        file_size: int = None,
     ) -> File:
         """Store metadata for a file uploaded by the user."""
         file = File(
             id=uuid.uuid4(),
+            s3_key=s3_key,
             file_url=file_url,
             file_type=file_type,
             file_size=file_size,
-            user_id=user.id,
         )
         self.db.add(file)
-        self.db.commit()
-        self.db.refresh(file)
+        await self.db.commit()
+        await self.db.refresh(file)
         return file
 
-    def get_file_by_id(self, file_id: uuid.UUID) -> File | None:
+    async def get_file_by_id(self, file_id: uuid.UUID) -> File | None:
         """Retrieve a file by ID, ensuring it belongs to the user."""
-        return self.db.query(File).filter(File.id == file_id).first()
+        return await self.db.get(File, file_id)
@@ -1,21 +1,25 @@
 import uuid
-from typing import List
+from typing import List, Tuple
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
+from config.response_cache import chat_scope, response_cache
 from database.database import get_db
 from database.models import Message, Chat, SenderType
+from repositories.cursor import fetch_page
 
 
-def get_message_repository(db: Session = Depends(get_db)):
+def get_message_repository(db: AsyncSession = Depends(get_db)):
     return MessageRepository(db)
 
 
 class MessageRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create_message(
+    async def create_message(
         self,
         chat: Chat,
         sender: SenderType,
@@ -33,15 +37,37 @@ class MessageRepository:
             message_metadata=metadata,
         )
         self.db.add(message)
-        self.db.commit()
-        self.db.refresh(message)
+        await self.db.commit()
+        # Load the file relationship now; lazy loads are not allowed under asyncio
+        await self.db.refresh(message, attribute_names=["file"])
+        await response_cache.invalidate(chat_scope(chat.id))
         return message
 
-    def get_messages_by_chat(self, chat: Chat) -> List[Message]:
-        """Retrieve all messages for a chat."""
-        return (
-            self.db.query(Message)
-            .filter(Message.chat_id == chat.id)
-            .order_by(Message.created_at.asc())
-            .all()
+    async def get_messages_page(
+        self, chat: Chat, limit: int = 50, cursor: str = None
+    ) -> Tuple[List[Message], str | None, str | None]:
+        """
+        Retrieve one page of a chat's messages in chronological order.
+
+        Uses keyset pagination on (created_at, id), served by the
+        (chat_id, created_at, id) index, so every page costs the same however
+        long the chat is.
+
+        Args:
+            chat (Chat): The chat to read.
+            limit (int): Maximum number of messages to return.
+            cursor (str): A next/prev cursor from a previous page; None for the first page.
+
+        Returns:
+            tuple: The messages, the cursor for the following page (or None) and the
+                cursor for the preceding page (or None).
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        query = (
+            select(Message)
+            .options(joinedload(Message.file))
+            .where(Message.chat_id == chat.id)
         )
+        return await fetch_page(self.db, query, Message, limit, cursor)
@@ -1,46 +1,46 @@
 import uuid
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from config.response_cache import chat_scope, response_cache
 from database.database import get_db
 from database.models import Tag, ChatTag
 
 
-def get_tag_repository(db: Session = Depends(get_db)):
+def get_tag_repository(db: AsyncSession = Depends(get_db)):
     return TagRepository(db)
 
 
 class TagRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create_tag(self, name: str) -> Tag:
+    async def create_tag(self, name: str) -> Tag:
         """Create a new tag for the user, or return existing one if it exists."""
-        tag = self.db.query(Tag).filter(Tag.name == name).first()
+        tag = await self.db.scalar(select(Tag).where(Tag.name == name))
         if not tag:
             tag = Tag(id=uuid.uuid4(), name=name)
             self.db.add(tag)
-            self.db.commit()
-            self.db.refresh(tag)
+            await self.db.commit()
+            await self.db.refresh(tag)
         return tag
 
-    def add_tag_to_chat(self, chat_id: uuid.UUID, tag_id: uuid.UUID) -> None:
+    async def add_tag_to_chat(self, chat_id: uuid.UUID, tag_id: uuid.UUID) -> None:
         """Associate a tag with a chat."""
         chat_tag = ChatTag(chat_id=chat_id, tag_id=tag_id)
         self.db.add(chat_tag)
-        self.db.commit()
+        await self.db.commit()
+        await response_cache.invalidate(chat_scope(chat_id))
 
-    def remove_tag_from_chat(self, chat_id: uuid.UUID, tag_id: uuid.UUID) -> None:
+    async def remove_tag_from_chat(self, chat_id: uuid.UUID, tag_id: uuid.UUID) -> None:
         """Remove a tag association from a chat."""
-        chat_tag = (
-            self.db.query(ChatTag)
-            .filter(ChatTag.chat_id == chat_id, ChatTag.tag_id == tag_id)
-            .first()
-        )
+        chat_tag = await self.db.get(ChatTag, (chat_id, tag_id))
         if chat_tag:
-            self.db.delete(chat_tag)
-            self.db.commit()
+            await self.db.delete(chat_tag)
+            await self.db.commit()
+            await response_cache.invalidate(chat_scope(chat_id))
 
-    def get_tag_by_id(self, tag_id: uuid.UUID) -> Tag | None:
+    async def get_tag_by_id(self, tag_id: uuid.UUID) -> Tag | None:
         """Retrieve a tag by ID, ensuring it belongs to the user."""
-        return self.db.query(Tag).filter(Tag.id == tag_id).first()
+        return await self.db.get(Tag, tag_id)
@@ -1,14 +1,32 @@
+import asyncio
+import json
 import logging
 import uuid
-import base64
 
-from fastapi import Depends, status, UploadFile, File, Form, HTTPException, APIRouter
-from fastapi.responses import JSONResponse
-from typing import Optional, List
+from fastapi import (
+    Depends,
+    status,
+    UploadFile,
+    File,
+    Form,
+    HTTPException,
+    APIRouter,
+    Request,
+)
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Optional, List, Literal
 
-from services.agent.graph import Graph
 from config.config import config
-from config.s3 import upload_to_s3, generate_presigned_url
+from config.response_cache import CHAT_LIST_SCOPE, chat_scope, response_cache
+from services.agent.attachments import (
+    Attachment,
+    AttachmentBudgetExceeded,
+    attachments_from_uploads,
+)
+from services.agent.graph import Graph
+from config.s3 import aupload_to_s3, agenerate_presigned_urls
 from repositories.chat import get_chat_repository, ChatRepository
 from repositories.message import get_message_repository, MessageRepository
 from repositories.file import get_file_repository, FileRepository
@@ -23,13 +41,22 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _json_body(response: CommonResponse) -> bytes:
+    """Serialize a response once, so the same bytes can be cached and returned."""
+    return JSONResponse(content=jsonable_encoder(response)).body
+
+
+def _json_bytes_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
 @router.post("/", response_model=CommonResponse, status_code=status.HTTP_201_CREATED)
 async def create_chat(
     chat: ChatCreate,
     chat_repo: ChatRepository = Depends(get_chat_repository),
 ):
     try:
-        db_chat = chat_repo.create_chat(title=chat.title)
+        db_chat = await chat_repo.create_chat(title=chat.title)
         return CommonResponse(
             message="Chat created successfully",
             status_code=status.HTTP_201_CREATED,
@@ -53,36 +80,82 @@ async def list_chats(
     chat_repo: ChatRepository = Depends(get_chat_repository),
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
+    pagination: Literal["offset", "cursor"] = "offset",
+    include_total: bool = True,
 ):
     try:
-        # Get chats and total count
-        chats = chat_repo.get_chats_by_user(limit=limit, offset=offset)
-        total_chats = chat_repo.count_chats_by_user()
+        cached, cache_key = await response_cache.get(
+            CHAT_LIST_SCOPE,
+            f"limit={limit}&offset={offset}&cursor={cursor}"
+            f"&pagination={pagination}&include_total={include_total}",
+        )
+        if cached is not None:
+            return _json_bytes_response(cached)
 
-        # Calculate pagination metadata
-        has_next = offset + limit < total_chats
-        has_previous = offset > 0
-        meta = {
-            "pagination": {
-                "total": total_chats,
-                "limit": limit,
-                "offset": offset,
-                "current_page": (offset // limit) + 1,
-                "total_pages": (total_chats + limit - 1) // limit,
-                "has_next": has_next,
-                "has_previous": has_previous,
-                "next_offset": offset + limit if has_next else None,
-                "previous_offset": max(0, offset - limit) if has_previous else None,
+        total_chats = await chat_repo.count_chats_by_user() if include_total else None
+
+        if cursor or pagination == "cursor":
+            # Keyset mode: constant cost per page regardless of depth
+            try:
+                chats, next_cursor, prev_cursor = await chat_repo.get_chats_page(
+                    limit=limit, cursor=cursor
+                )
+            except ValueError as e:
+                return JSONResponse(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    content=CommonResponse(
+                        message="Invalid cursor",
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        data=None,
+                        error=str(e),
+                    ).dict(),
+                )
+            meta = {
+                "pagination": {
+                    "total": total_chats,
+                    "limit": limit,
+                    "has_next": next_cursor is not None,
+                    "has_previous": prev_cursor is not None,
+                    "next_cursor": next_cursor,
+                    "prev_cursor": prev_cursor,
+                }
+            }
+        else:
+            # Fetch one extra row so has_next does not depend on the total
+            chats = await chat_repo.get_chats_by_user(limit=limit + 1, offset=offset)
+            has_next = len(chats) > limit
+            chats = chats[:limit]
+            has_previous = offset > 0
+            meta = {
+                "pagination": {
+                    "total": total_chats,
+                    "limit": limit,
+                    "offset": offset,
+                    "current_page": (offset // limit) + 1,
+                    "total_pages": (
+                        (total_chats + limit - 1) // limit
+                        if total_chats is not None
+                        else None
+                    ),
+                    "has_next": has_next,
+                    "has_previous": has_previous,
+                    "next_offset": offset + limit if has_next else None,
+                    "previous_offset": max(0, offset - limit) if has_previous else None,
+                }
             }
-        }
 
-        return CommonResponse(
-            message="Chats retrieved successfully",
-            status_code=status.HTTP_200_OK,
-            data=[ChatInDB.from_orm(chat).dict() for chat in chats],
-            error=None,
-            meta=meta,
+        body = _json_body(
+            CommonResponse(
+                message="Chats retrieved successfully",
+                status_code=status.HTTP_200_OK,
+                data=[ChatInDB.from_orm(chat).dict() for chat in chats],
+                error=None,
+                meta=meta,
+            )
         )
+        await response_cache.set(cache_key, body)
+        return _json_bytes_response(body)
     except Exception as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -100,12 +173,17 @@ async def get_chat(
     chat_id: uuid.UUID,
     chat_repo: ChatRepository = Depends(get_chat_repository),
     message_repo: MessageRepository = Depends(get_message_repository),
-    file_repo: FileRepository = Depends(get_file_repository),
     limit: int = 50,
-    offset: int = 0,
+    cursor: Optional[str] = None,
 ):
     try:
-        db_chat = chat_repo.get_chat_by_id(chat_id)
+        cached, cache_key = await response_cache.get(
+            chat_scope(chat_id), f"limit={limit}&cursor={cursor}"
+        )
+        if cached is not None:
+            return _json_bytes_response(cached)
+
+        db_chat = await chat_repo.get_chat_by_id(chat_id)
         if not db_chat:
             return JSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -117,29 +195,55 @@ async def get_chat(
                 ).dict(),
             )
 
-        messages = message_repo.get_messages_by_chat(db_chat)[offset : offset + limit]
-        chat_response = ChatDetailInDB.from_orm(db_chat)
-        chat_response.messages = []
+        try:
+            messages, next_cursor, prev_cursor = await message_repo.get_messages_page(
+                db_chat, limit=limit, cursor=cursor
+            )
+        except ValueError as e:
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content=CommonResponse(
+                    message="Invalid cursor",
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    data=None,
+                    error=str(e),
+                ).dict(),
+            )
+        # Chat.messages cannot be lazy-loaded under asyncio, copy the columns only
+        chat_response = ChatDetailInDB(**dict(ChatInDB.from_orm(db_chat)), messages=[])
 
+        # Sign every attached file in one pass instead of once per message
+        file_urls = await agenerate_presigned_urls(
+            [msg.file.s3_key for msg in messages if msg.file and msg.file.s3_key],
+            expires_in=3600,
+        )
         for msg in messages:
             message_response = MessageInDB.from_orm(msg)
-            if msg.file_id:
-                db_file = file_repo.get_file_by_id(msg.file_id)
-                if db_file:
-                    file_key = db_file.file_url.split(
-                        f"{config.AWS_S3_BUCKET}.s3.{config.AWS_REGION_NAME}.amazonaws.com/"
-                    )[-1]
-                    message_response.file.file_url = generate_presigned_url(
-                        file_key, expires_in=3600
-                    )
+            if message_response.file and msg.file.s3_key in file_urls:
+                message_response.file.file_url = file_urls[msg.file.s3_key]
             chat_response.messages.append(message_response)
 
-        return CommonResponse(
-            message="Chat details retrieved successfully",
-            status_code=status.HTTP_200_OK,
-            data=chat_response.dict(),
-            error=None,
+        meta = {
+            "pagination": {
+                "limit": limit,
+                "has_next": next_cursor is not None,
+                "has_previous": prev_cursor is not None,
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor,
+            }
+        }
+
+        body = _json_body(
+            CommonResponse(
+                message="Chat details retrieved successfully",
+                status_code=status.HTTP_200_OK,
+                data=chat_response.dict(),
+                error=None,
+                meta=meta,
+            )
         )
+        await response_cache.set(cache_key, body)
+        return _json_bytes_response(body)
     except Exception as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -158,7 +262,7 @@ async def delete_chat(
     chat_repo: ChatRepository = Depends(get_chat_repository),
 ):
     try:
-        deleted = chat_repo.delete_chat(chat_id)
+        deleted = await chat_repo.delete_chat(chat_id)
         if not deleted:
             return JSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -201,7 +305,7 @@ async def send_message_auth(
     file_repo: FileRepository = Depends(get_file_repository),
 ):
     try:
-        db_chat = chat_repo.get_chat_by_id(chat_id)
+        db_chat = await chat_repo.get_chat_by_id(chat_id)
         if not db_chat:
             return JSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -218,8 +322,11 @@ async def send_message_auth(
         file_url = None
         if file:
             try:
-                file_url = upload_to_s3(file, folder=f"chat_{chat_id}", expires_in=3600)
-                db_file = file_repo.create_file(
+                file_key, file_url = await aupload_to_s3(
+                    file, folder=f"chat_{chat_id}", expires_in=3600
+                )
+                db_file = await file_repo.create_file(
+                    s3_key=file_key,
                     file_url=file_url,
                     file_type=file.content_type,
                     file_size=file.size,
@@ -237,20 +344,20 @@ async def send_message_auth(
                 )
 
         # Create user message
-        db_message = message_repo.create_message(
+        db_message = await message_repo.create_message(
             chat=db_chat, sender=SenderType.USER, content=content, file_id=file_id
         )
 
         # Call Agent and Core Services
         if content or file_id:
             try:
-                message_repo.create_message(
+                await message_repo.create_message(
                     chat=db_chat,
                     sender=SenderType.AGENT,
                     content=content,
                     metadata={"original_content": content},
                 )
-                message_repo.create_message(
+                await message_repo.create_message(
                     chat=db_chat, sender=SenderType.AGENT, content=content
                 )
             except HTTPException as e:
@@ -294,7 +401,7 @@ async def add_tag(
     tag_repo: TagRepository = Depends(get_tag_repository),
 ):
     try:
-        db_chat = chat_repo.get_chat_by_id(chat_id)
+        db_chat = await chat_repo.get_chat_by_id(chat_id)
         if not db_chat:
             return JSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -306,8 +413,8 @@ async def add_tag(
                 ).dict(),
             )
 
-        db_tag = tag_repo.create_tag(tag.name)
-        tag_repo.add_tag_to_chat(chat_id, db_tag.id)
+        db_tag = await tag_repo.create_tag(tag.name)
+        await tag_repo.add_tag_to_chat(chat_id, db_tag.id)
         return CommonResponse(
             message="Tag added to chat successfully",
             status_code=status.HTTP_201_CREATED,
@@ -337,7 +444,7 @@ async def remove_tag(
     tag_repo: TagRepository = Depends(get_tag_repository),
 ):
     try:
-        db_chat = chat_repo.get_chat_by_id(chat_id)
+        db_chat = await chat_repo.get_chat_by_id(chat_id)
         if not db_chat:
             return JSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -349,7 +456,7 @@ async def remove_tag(
                 ).dict(),
             )
 
-        db_tag = tag_repo.get_tag_by_id(tag_id)
+        db_tag = await tag_repo.get_tag_by_id(tag_id)
         if not db_tag:
             return JSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -361,7 +468,7 @@ async def remove_tag(
                 ).dict(),
             )
 
-        tag_repo.remove_tag_from_chat(chat_id, tag_id)
+        await tag_repo.remove_tag_from_chat(chat_id, tag_id)
         return CommonResponse(
             message="Tag removed from chat successfully",
             status_code=status.HTTP_204_NO_CONTENT,
@@ -380,29 +487,48 @@ async def remove_tag(
         )
 
 
-@router.post(
-    "/messages", status_code=status.HTTP_200_OK, tags=["chat"], response_model=None
-)
-async def send_message(
-    content: Optional[str] = Form(None, max_length=3000),
-    is_new_chat: Optional[bool] = Form(None),
-    session_id: Optional[str] = Form(None),
-    attachments: Optional[List[UploadFile]] = File(None),
-    chat_repo: ChatRepository = Depends(get_chat_repository),
-) -> JSONResponse:
-    """
-    Handle incoming messages and return the Agent's response.
-
-    Args:
-        content (Optional[str]): The user's message, max 3000 characters.
-        is_new_chat (Optional[bool]): The new chat flag.
-        session_id (Optional[str]): The session ID for existing chats.
-        attachments (Optional[List[UploadFile]]): Optional array of file attachments.
-        chat_repo (ChatRepository): Dependency to interact with the chat repository.
-    Returns:
-        JSONResponse: Agent's response as JSON if response_type is 'json'.
-    """
-
+def _sse_event(event: str, data: dict) -> str:
+    """Encode one server-sent event frame."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _stream_agent_response(
+    agent: Graph,
+    content: Optional[str],
+    attachment_data: List[Attachment],
+    session_id: str,
+) -> StreamingResponse:
+    """Stream the agent's progress as server-sent events."""
+
+    async def events():
+        try:
+            yield _sse_event("session", {"session_id": session_id})
+            async for event, data in agent.stream_message(
+                content, attachments=attachment_data
+            ):
+                if event == "done":
+                    data = {**data, "session_id": session_id}
+                yield _sse_event(event, data)
+        finally:
+            for attachment in attachment_data:
+                attachment.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(agent.update_summary),
+    )
+
+
+async def _handle_send_message(
+    content: Optional[str],
+    is_new_chat: Optional[bool],
+    session_id: Optional[str],
+    attachments: Optional[List[UploadFile]],
+    stream: bool,
+):
     if is_new_chat not in [1, 0, "1", "0", "True", "False", "true", "false", None]:
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -433,23 +559,19 @@ async def send_message(
     agent = Graph(session_id=session_id)
 
     try:
-        # Process attachments if provided
-        attachment_data = []
-        if attachments:
-            for file in attachments:
-                if file:
-                    # Read file content
-                    content = await file.read()
-                    # Convert file content to Base64
-                    base64_content = base64.b64encode(content).decode("utf-8")
-                    attachment_data.append(
-                        {
-                            "filename": file.filename,
-                            "content_type": file.content_type,
-                            "size": len(content),
-                            "base64": base64_content,  # Add Base64-encoded content
-                        }
-                    )
+        # Attachments are passed as references to the spooled uploads; their bytes
+        # are read only when the model payload is built. Copying them for a stream is
+        # blocking file I/O, so it runs in a worker thread.
+        attachment_data = await asyncio.to_thread(
+            attachments_from_uploads,
+            attachments or [],
+            budget_bytes=config.ATTACHMENT_MEMORY_BUDGET_BYTES,
+            # A streamed body outlives the request's form, which closes the uploads
+            copy=stream,
+        )
+
+        if stream:
+            return _stream_agent_response(agent, content, attachment_data, session_id)
 
         response, resources, images = await agent.get_message(
             content, attachments=attachment_data
@@ -462,6 +584,13 @@ async def send_message(
                 "resources": resources,
                 "images": images,
             },
+            # Summarizing older turns does not delay the response
+            background=BackgroundTask(agent.update_summary),
+        )
+    except AttachmentBudgetExceeded as e:
+        return JSONResponse(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            content={"error": str(e)},
         )
     except Exception as e:
         logger.error(f"Error processing message: {e}")
@@ -469,3 +598,66 @@ async def send_message(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={"error": f"Failed to process message: {str(e)}"},
         )
+
+
+@router.post(
+    "/messages", status_code=status.HTTP_200_OK, tags=["chat"], response_model=None
+)
+async def send_message(
+    request: Request,
+    content: Optional[str] = Form(None, max_length=3000),
+    is_new_chat: Optional[bool] = Form(None),
+    session_id: Optional[str] = Form(None),
+    attachments: Optional[List[UploadFile]] = File(None),
+    chat_repo: ChatRepository = Depends(get_chat_repository),
+) -> JSONResponse | StreamingResponse:
+    """
+    Handle incoming messages and return the Agent's response.
+
+    Sending `Accept: text/event-stream` streams the response as server-sent events,
+    like POST /chats/messages/stream.
+
+    Args:
+        request (Request): The incoming request, used for content negotiation.
+        content (Optional[str]): The user's message, max 3000 characters.
+        is_new_chat (Optional[bool]): The new chat flag.
+        session_id (Optional[str]): The session ID for existing chats.
+        attachments (Optional[List[UploadFile]]): Optional array of file attachments.
+        chat_repo (ChatRepository): Dependency to interact with the chat repository.
+    Returns:
+        JSONResponse: Agent's response as JSON, or a StreamingResponse of events.
+    """
+    stream = "text/event-stream" in request.headers.get("accept", "")
+    return await _handle_send_message(
+        content, is_new_chat, session_id, attachments, stream=stream
+    )
+
+
+@router.post(
+    "/messages/stream",
+    status_code=status.HTTP_200_OK,
+    tags=["chat"],
+    response_model=None,
+)
+async def stream_message(
+    content: Optional[str] = Form(None, max_length=3000),
+    is_new_chat: Optional[bool] = Form(None),
+    session_id: Optional[str] = Form(None),
+    attachments: Optional[List[UploadFile]] = File(None),
+) -> JSONResponse | StreamingResponse:
+    """
+    Handle incoming messages and stream the Agent's progress as server-sent events.
+
+    Events, each with a JSON `data` payload:
+        - session: {"session_id"}, sent first.
+        - token: {"text"}, a text delta from the model.
+        - tool_start: {"name", "input"}; tool_end: {"name"}.
+        - done: {"message", "session_id", "resources", "images"}, sent after the
+          conversation has been saved.
+        - error: {"error"}.
+
+    Validation errors are returned as JSON before the stream starts.
+    """
+    return await _handle_send_message(
+        content, is_new_chat, session_id, attachments, stream=True
+    )
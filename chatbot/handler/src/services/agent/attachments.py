@@ -0,0 +1,167 @@
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO, List, Optional
+
+from fastapi import UploadFile
+from langchain_core.messages import BaseMessage
+
+# Bedrock Converse image and document formats, by MIME type
+IMAGE_FORMATS = {
+    "image/png": "png",
+    "image/jpeg": "jpeg",
+    "image/gif": "gif",
+    "image/webp": "webp",
+}
+DOCUMENT_FORMATS = {
+    "application/pdf": "pdf",
+    "text/csv": "csv",
+    "application/msword": "doc",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+    "application/vnd.ms-excel": "xls",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "xlsx",
+    "text/html": "html",
+    "text/plain": "txt",
+    "text/markdown": "md",
+}
+
+# Files up to this size stay in memory when copied; larger ones go to a temp file
+SPOOL_MAX_BYTES = 1024 * 1024
+
+
+class AttachmentBudgetExceeded(ValueError):
+    """The attachments of one request are larger than the memory budget."""
+
+
+@dataclass
+class Attachment:
+    """
+    Reference to an uploaded file.
+
+    The bytes stay in the upload's spooled temp file until the model payload is
+    built, and are then passed to Bedrock as raw bytes without base64 encoding.
+    """
+
+    filename: str
+    content_type: str
+    size: int
+    file: BinaryIO
+    owns_file: bool = False
+
+    @classmethod
+    def from_upload(cls, upload: UploadFile, copy: bool = False) -> "Attachment":
+        """
+        Wrap an UploadFile.
+
+        Args:
+            upload (UploadFile): The uploaded file.
+            copy (bool): Copy the upload into a spooled file owned by the attachment, for
+                use after the request's form has been closed (streamed responses).
+        """
+        file = upload.file
+        if copy:
+            upload.file.seek(0)
+            file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+            shutil.copyfileobj(upload.file, file)
+        return cls(
+            filename=upload.filename or "attachment",
+            content_type=upload.content_type or "application/octet-stream",
+            size=upload.size if upload.size is not None else _stream_size(upload.file),
+            file=file,
+            owns_file=copy,
+        )
+
+    @property
+    def model_readable(self) -> bool:
+        return (
+            self.content_type in IMAGE_FORMATS or self.content_type in DOCUMENT_FORMATS
+        )
+
+    def read(self) -> bytes:
+        self.file.seek(0)
+        return self.file.read()
+
+    def to_content_block(self) -> Optional[dict]:
+        """Build the Bedrock Converse content block, or None for unsupported types."""
+        if self.content_type in IMAGE_FORMATS:
+            return {
+                "image": {
+                    "format": IMAGE_FORMATS[self.content_type],
+                    "source": {"bytes": self.read()},
+                }
+            }
+        if self.content_type in DOCUMENT_FORMATS:
+            return {
+                "document": {
+                    "format": DOCUMENT_FORMATS[self.content_type],
+                    "name": _document_name(self.filename),
+                    "source": {"bytes": self.read()},
+                }
+            }
+        return None
+
+    def describe(self) -> str:
+        note = "" if self.model_readable else ", not readable by the model"
+        return f"{self.filename} ({self.content_type}, {self.size} bytes{note})"
+
+    def close(self):
+        if self.owns_file:
+            self.file.close()
+
+
+def attachments_from_uploads(
+    uploads: List[UploadFile], budget_bytes: int, copy: bool = False
+) -> List[Attachment]:
+    """
+    Wrap a request's uploads, enforcing a per-request memory budget.
+
+    Every attachment is read into memory while a model payload is built, so their
+    combined size is what a request can cost. With `copy`, the uploads are copied with
+    blocking file I/O; async callers should run this in a worker thread.
+
+    Raises:
+        AttachmentBudgetExceeded: If the combined size is over `budget_bytes`.
+    """
+    uploads = [upload for upload in uploads if upload]
+    total = sum(
+        upload.size if upload.size is not None else _stream_size(upload.file)
+        for upload in uploads
+    )
+    if total > budget_bytes:
+        raise AttachmentBudgetExceeded(
+            f"Attachments total {total} bytes, over the limit of {budget_bytes} bytes"
+        )
+    return [Attachment.from_upload(upload, copy=copy) for upload in uploads]
+
+
+def attachment_note(attachments: List[Attachment]) -> str:
+    """Text recorded in place of the attachments, in the message and in history."""
+    return "Attached files: " + "; ".join(a.describe() for a in attachments)
+
+
+def with_attachments(
+    message: BaseMessage, attachments: List[Attachment]
+) -> BaseMessage:
+    """Return a copy of a text message with the attachments' content blocks added."""
+    blocks = [block for a in attachments if (block := a.to_content_block())]
+    if not blocks:
+        return message
+    return message.model_copy(
+        update={"content": [{"type": "text", "text": message.content}, *blocks]}
+    )
+
+
+def _stream_size(file: BinaryIO) -> int:
+    position = file.tell()
+    file.seek(0, 2)
+    size = file.tell()
+    file.seek(position)
+    return size
+
+
+def _document_name(filename: str) -> str:
+    # Bedrock allows letters, digits, single spaces, hyphens, parentheses and brackets
+    stem = filename.rsplit(".", 1)[0]
+    name = re.sub(r"[^A-Za-z0-9\-\(\)\[\] ]", " ", stem)
+    return re.sub(r"\s+", " ", name).strip() or "document"
@@ -0,0 +1,232 @@
+import json
+import threading
+from dataclasses import dataclass
+from typing import List, Sequence
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    ToolMessage,
+)
+
+from .llm import get_llm
+from .utils import extract_text_delta
+
+# Rough number of characters per token; close enough to budget English text and JSON
+CHARS_PER_TOKEN = 4
+
+# Fixed cost of a message's role and framing, in tokens
+MESSAGE_OVERHEAD_TOKENS = 4
+
+TRUNCATED_NOTE = "\n[... tool output truncated]"
+OMITTED_TOOL_OUTPUT = "[Tool output omitted from the conversation history]"
+
+# Longest tool output quoted in the transcript given to the summarizer
+SUMMARY_TOOL_OUTPUT_CHARS = 500
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and an assistant.
+
+Current summary:
+{summary}
+
+Messages to add to the summary:
+{transcript}
+
+Write the updated summary in at most {max_words} words. Keep the facts, names, numbers, decisions and open questions the user may refer back to; leave out search result details that were not used in an answer. Reply with the summary only."""
+
+
+def estimate_tokens(message: BaseMessage) -> int:
+    """Approximate the number of tokens a message adds to the prompt."""
+    content = message.content
+    if isinstance(content, str):
+        chars = len(content)
+        if isinstance(message, AIMessage) and message.tool_calls:
+            chars += len(json.dumps(message.tool_calls, default=str))
+    else:
+        # Tool calls are also present as tool_use blocks
+        chars = sum(
+            (
+                len(block.get("text", ""))
+                if isinstance(block, dict) and block.get("type") == "text"
+                else len(json.dumps(block, default=str))
+            )
+            for block in content
+        )
+    return chars // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+
+
+@dataclass
+class PackedHistory:
+    messages: List[BaseMessage]
+    tokens: int
+    # Leading messages of the input left out (they should be folded into the summary)
+    dropped: int
+    truncated_tool_outputs: int
+    omitted_tool_outputs: int
+
+
+def pack_history(
+    messages: Sequence[BaseMessage], budget_tokens: int, tool_output_max_tokens: int
+) -> PackedHistory:
+    """
+    Fit the tail of a conversation into a token budget.
+
+    In order, until the history fits:
+        1. Every tool output is truncated to `tool_output_max_tokens`.
+        2. Tool outputs of earlier turns are replaced by a short note, oldest first.
+           The message itself is kept, so each tool call still has its result.
+        3. Whole turns are dropped, oldest first. The latest turn is always kept.
+
+    The result always starts on a human message, as Bedrock Converse requires; messages
+    before the first one (e.g. the end of a turn whose start was folded into the
+    summary) are dropped, and no history is kept when there is none.
+
+    Args:
+        messages (Sequence[BaseMessage]): The history, in chronological order.
+        budget_tokens (int): Approximate number of tokens the history may use.
+        tool_output_max_tokens (int): Approximate size limit of one tool output.
+
+    Returns:
+        PackedHistory: The messages to send and what was left out.
+    """
+    start = _turn_start(messages)
+    truncated = 0
+    packed = []
+    for message in messages[start:]:
+        shortened = _truncate_tool_output(message, tool_output_max_tokens)
+        truncated += shortened is not message
+        packed.append(shortened)
+
+    turns: List[List[BaseMessage]] = []
+    for message in packed:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    sizes = [[estimate_tokens(message) for message in turn] for turn in turns]
+    total = sum(map(sum, sizes))
+
+    omitted = 0
+    for turn, turn_sizes in zip(turns[:-1], sizes[:-1]):
+        for i, message in enumerate(turn):
+            if total <= budget_tokens:
+                break
+            if isinstance(message, ToolMessage):
+                turn[i] = message.model_copy(update={"content": OMITTED_TOOL_OUTPUT})
+                size = estimate_tokens(turn[i])
+                total -= turn_sizes[i] - size
+                turn_sizes[i] = size
+                omitted += 1
+
+    dropped = start
+    while total > budget_tokens and len(turns) > 1:
+        total -= sum(sizes.pop(0))
+        dropped += len(turns.pop(0))
+
+    return PackedHistory(
+        messages=[message for turn in turns for message in turn],
+        tokens=total,
+        dropped=dropped,
+        truncated_tool_outputs=truncated,
+        omitted_tool_outputs=omitted,
+    )
+
+
+async def summarize(
+    summary: str, messages: Sequence[BaseMessage], max_words: int
+) -> str:
+    """Fold messages into a conversation summary with the chat model."""
+    prompt = SUMMARY_PROMPT.format(
+        summary=summary or "(none yet)",
+        transcript="\n".join(_transcript_line(message) for message in messages),
+        max_words=max_words,
+    )
+    response = await get_llm().ainvoke([HumanMessage(content=prompt)])
+    return extract_text_delta(response).strip()
+
+
+class ContextStats:
+    """Counters describing how history is packed and summarized."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.packed = 0
+        self.tokens = 0
+        self.dropped_messages = 0
+        self.truncated_tool_outputs = 0
+        self.omitted_tool_outputs = 0
+        self.summary_updates = 0
+        self.summary_errors = 0
+
+    def record_pack(self, packed: PackedHistory):
+        with self._lock:
+            self.packed += 1
+            self.tokens += packed.tokens
+            self.dropped_messages += packed.dropped
+            self.truncated_tool_outputs += packed.truncated_tool_outputs
+            self.omitted_tool_outputs += packed.omitted_tool_outputs
+
+    def record_summary(self, ok: bool):
+        with self._lock:
+            if ok:
+                self.summary_updates += 1
+            else:
+                self.summary_errors += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "packed": self.packed,
+                "avg_history_tokens": (
+                    round(self.tokens / self.packed, 1) if self.packed else None
+                ),
+                "dropped_messages": self.dropped_messages,
+                "truncated_tool_outputs": self.truncated_tool_outputs,
+                "omitted_tool_outputs": self.omitted_tool_outputs,
+                "summary_updates": self.summary_updates,
+                "summary_errors": self.summary_errors,
+            }
+
+
+context_stats = ContextStats()
+
+
+def _turn_start(messages: Sequence[BaseMessage]) -> int:
+    for i, message in enumerate(messages):
+        if isinstance(message, HumanMessage):
+            return i
+    return len(messages)
+
+
+def _truncate_tool_output(message: BaseMessage, max_tokens: int) -> BaseMessage:
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if (
+        not isinstance(message, ToolMessage)
+        or not isinstance(message.content, str)
+        or len(message.content) <= max_chars
+    ):
+        return message
+    return message.model_copy(
+        update={"content": message.content[:max_chars] + TRUNCATED_NOTE}
+    )
+
+
+def _transcript_line(message: BaseMessage) -> str:
+    text = message.content
+    if not isinstance(text, str):
+        text = extract_text_delta(message)
+    if isinstance(message, HumanMessage):
+        return f"User: {text}"
+    if isinstance(message, ToolMessage):
+        if len(text) > SUMMARY_TOOL_OUTPUT_CHARS:
+            text = text[:SUMMARY_TOOL_OUTPUT_CHARS] + " ..."
+        return f"Tool result ({message.name or 'tool'}): {text}"
+    if isinstance(message, AIMessage) and message.tool_calls:
+        calls = ", ".join(
+            f"{call['name']}({json.dumps(call['args'], default=str)})"
+            for call in message.tool_calls
+        )
+        return " ".join(
+            part for part in ("Assistant:", text, f"[called {calls}]") if part
+        )
+    return f"Assistant: {text}"
@@ -1,146 +1,239 @@
+import asyncio
 import logging
-from typing import Optional, List, Tuple
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional, List, Tuple
 
-from langchain_core.messages import ToolMessage, HumanMessage, SystemMessage, AIMessage
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
 from langchain_core.runnables import RunnableConfig
-from langchain_postgres import PostgresChatMessageHistory
 from langgraph.graph import StateGraph, END
 
+from config.config import config
+from config.lazy import lazy
 from database import database
 
-from .llm import llm
-from .tools import TOOLS
+from .attachments import Attachment, attachment_note, with_attachments
+from .context import context_stats, estimate_tokens, pack_history, summarize
+from .history import SessionSummary, WindowedChatMessageHistory
+from .llm import get_llm
+from .semantic_cache import CachedAnswer, SemanticCache, get_semantic_cache
+from .tools import TOOLS, TOOLS_BY_NAME
 from .state import InputState, State
-from .utils import format_response_message, format_tool_message
+from .utils import (
+    build_tool_artifact,
+    extract_text_delta,
+    format_response_message,
+    format_tool_message,
+)
 
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT = """You are a helpful assistant designed to provide accurate and relevant answers. Follow these guidelines:
+        1. Answer the user's question to the best of your ability in a clear, concise, and conversational tone.
+        2. If you don't know the answer, respond with "I don't know" and suggest how the user can find the information.
+        3. If the question is unclear, ask the user to clarify or provide more details.
+        4. Use the provided conversation history (the most recent messages, and a summary of earlier ones when present) to give contextually relevant answers.
+        5. You have access to tools to retrieve external information. Use them when the question requires up-to-date data, specific facts, or information beyond your knowledge.
+        6. If more context is needed, ask the user for additional details.
+        The user's question follows the history."""
 
-class Graph:
-    def __init__(self, session_id=None):
-        self.thread_id = session_id
+SUMMARY_HEADER = "Summary of the earlier conversation:"
+
+
+@lazy
+def get_bound_model():
+    """The chat model with the agent's tools bound, shared by all requests."""
+    return get_llm().bind_tools(TOOLS)
+
+
+async def _call_model(state: State, config: RunnableConfig):
+    messages = state["messages"]
+    # Attachment bytes are only read here, for the duration of the model call
+    attachments = config["configurable"].get("attachments")
+    if attachments:
+        messages = [
+            (
+                with_attachments(message, attachments[message.id])
+                if message.id in attachments
+                else message
+            )
+            for message in messages
+        ]
+    # ainvoke lets astream_events surface the model's token deltas
+    response = await get_bound_model().ainvoke(messages, config)
+    return {"messages": [response]}
 
-        self.conversation_history = PostgresChatMessageHistory(
-            "chat_history",
-            session_id,
-            sync_connection=database.sync_connection,
+
+async def _call_tool(tool_call: dict) -> ToolMessage:
+    """Run one tool call; failures and timeouts become an error ToolMessage."""
+    tool_name = tool_call["name"]
+    tool_args = tool_call["args"]
+    logger.debug(f"Tool call: {tool_name}, args: {tool_args}")
+    timeout = config.TOOL_TIMEOUT_SECONDS
+    try:
+        if tool_name == "tavily_search":
+            # Ensure args is a dict with expected structure
+            if isinstance(tool_args, str):
+                tool_args = {"query": tool_args}
+            elif not isinstance(tool_args, dict):
+                logger.warning(
+                    f"Invalid tool args for {tool_name}: {tool_args}, converting to dict"
+                )
+                tool_args = {"query": str(tool_args)}
+        tool_result = await asyncio.wait_for(
+            TOOLS_BY_NAME[tool_name].ainvoke(tool_args), timeout=timeout
+        )
+        # The model gets compact text; resources and images are read from the artifact
+        artifact = build_tool_artifact(tool_name, tool_result)
+        return ToolMessage(
+            content=format_tool_message(artifact, tool_result),
+            artifact=artifact,
+            name=tool_name,
+            tool_call_id=tool_call["id"],
+        )
+    except asyncio.TimeoutError:
+        logger.error(f"Tool {tool_name} timed out after {timeout}s")
+        return ToolMessage(
+            content=f"Error: Tool {tool_name} timed out after {timeout}s",
+            name=tool_name,
+            tool_call_id=tool_call["id"],
         )
-        self.model = llm.bind_tools(TOOLS)
-        workflow = StateGraph(State, input=InputState)
-        workflow.add_node("llm", self.__call_model)
-        workflow.add_node("tools", self.__call_tools)
-        workflow.set_entry_point("llm")
-        workflow.add_conditional_edges(
-            "llm",
-            self.__should_continue,
-            {
-                "continue": "tools",
-                "end": END,
-            },
+    except Exception as e:
+        logger.error(f"Error invoking tool {tool_name}: {e}")
+        return ToolMessage(
+            content=f"Error: Failed to invoke tool {tool_name}: {str(e)}",
+            name=tool_name,
+            tool_call_id=tool_call["id"],
         )
-        workflow.add_edge("tools", "llm")
-        self.graph = workflow.compile()
 
-    def __call_model(self, state: State, config: RunnableConfig):
-        response = self.model.invoke(state["messages"], config)
-        return {"messages": [response]}
 
-    @staticmethod
-    def __call_tools(state: State):
-        outputs = []
-        tools_by_name = {tool.name: tool for tool in TOOLS}
-        for tool_call in state["messages"][-1].tool_calls:
-            tool_name = tool_call["name"]
-            tool_args = tool_call["args"]
-            logger.debug(f"Tool call: {tool_name}, args: {tool_args}")
-            try:
-                if tool_name == "tavily_search":
-                    # Ensure args is a dict with expected structure
-                    if isinstance(tool_args, str):
-                        tool_args = {"query": tool_args}
-                    elif not isinstance(tool_args, dict):
-                        logger.warning(
-                            f"Invalid tool args for {tool_name}: {tool_args}, converting to dict"
-                        )
-                        tool_args = {"query": str(tool_args)}
-                    tool_result = tools_by_name[tool_name].invoke(tool_args)
-                else:
-                    tool_result = tools_by_name[tool_name].invoke(tool_args)
-                formatted_result = format_tool_message(tool_call, tool_result)
-                outputs.append(
-                    ToolMessage(
-                        content=formatted_result,
-                        name=tool_name,
-                        tool_call_id=tool_call["id"],
-                    )
-                )
-            except Exception as e:
-                logger.error(f"Error invoking tool {tool_name}: {e}")
-                outputs.append(
-                    ToolMessage(
-                        content=f"Error: Failed to invoke tool {tool_name}: {str(e)}",
-                        name=tool_name,
-                        tool_call_id=tool_call["id"],
-                    )
-                )
-        return {"messages": outputs}
+async def _call_tools(state: State):
+    # Tool calls run concurrently; gather keeps results in tool_call order
+    outputs = await asyncio.gather(
+        *(_call_tool(tool_call) for tool_call in state["messages"][-1].tool_calls)
+    )
+    return {"messages": list(outputs)}
 
-    @staticmethod
-    def __should_continue(state: State):
-        messages = state["messages"]
-        if not messages[-1].tool_calls:
-            return "end"
-        return "continue"
 
-    async def get_message(
-        self, question: str, attachments: Optional[List[dict]] = None
-    ) -> Tuple[str, List[str], List[str]]:
+def _should_continue(state: State):
+    messages = state["messages"]
+    if not messages[-1].tool_calls:
+        return "end"
+    return "continue"
+
+
+def build_workflow() -> StateGraph:
+    """Define the agent's LLM <-> tools loop."""
+    workflow = StateGraph(State, input=InputState)
+    workflow.add_node("llm", _call_model)
+    workflow.add_node("tools", _call_tools)
+    workflow.set_entry_point("llm")
+    workflow.add_conditional_edges(
+        "llm",
+        _should_continue,
+        {
+            "continue": "tools",
+            "end": END,
+        },
+    )
+    workflow.add_edge("tools", "llm")
+    return workflow
+
+
+@lazy
+def get_compiled_graph():
+    """
+    The compiled workflow, built once per process.
+
+    Nothing request-specific lives in the graph; per-request values are passed in
+    config["configurable"].
+    """
+    return build_workflow().compile()
+
+
+class Graph:
+    def __init__(self, session_id=None):
+        self.thread_id = session_id
+        # Messages before this chat_history id are no longer sent to the model and
+        # are folded into the summary by update_summary()
+        self._fold_before_id: Optional[int] = None
+        # Whether the prepared context carries a summary of earlier turns
+        self._has_summary = False
+
+    @asynccontextmanager
+    async def conversation_history(self) -> AsyncIterator[WindowedChatMessageHistory]:
         """
-        Invoke the graph to process a question and return all new messages in a structured format.
+        Check a pooled connection out for one history operation.
 
-        Args:
-            question (str): The user's question or message.
-            attachments (Optional[List[dict]]): Optional attachments related to the question.
+        Connections are held only while reading or writing history, not for the
+        duration of the LLM and tool calls in between.
+        """
+        pool = await database.get_async_history_pool()
+        async with pool.connection() as conn:
+            yield WindowedChatMessageHistory(
+                "chat_history", self.thread_id, async_connection=conn
+            )
 
-        Returns:
-            str: A structured string containing all new messages generated during processing.
+    async def _prepare_messages(
+        self, question: Optional[str], attachments: Optional[List[Attachment]] = None
+    ) -> Tuple[List[BaseMessage], BaseMessage]:
         """
-        history_messages = self.conversation_history.get_messages()
+        Build the model's context for a question.
 
-        # Get the last 10 messages, or all if fewer than 10
-        last_10_messages = (
-            history_messages[-10:] if len(history_messages) > 10 else history_messages
-        )
+        Attachments are recorded as a text note on the new message; their content is
+        added only when the model is called (see _call_model), so it never enters the
+        graph state or the saved history.
 
-        if len(last_10_messages) > 0 and isinstance(last_10_messages[0], ToolMessage):
-            for i in range(len(history_messages) - 1, -1, -1):
-                if isinstance(history_messages[i], HumanMessage):
-                    start_index = max(0, i)
-                    end_index = min(len(history_messages), start_index + 10)
-                    last_10_messages = history_messages[start_index:end_index]
-                    break
-            else:
-                last_10_messages = (
-                    history_messages[-10:]
-                    if len(history_messages) > 10
-                    else history_messages
-                )
+        Returns:
+            tuple: The context messages (system prompt with the session summary, and the
+            recent history packed into HISTORY_TOKEN_BUDGET) and the new
+            message carrying the question (a HumanMessage, or a ToolMessage answering a
+            pending human_assistance call).
+        """
+        async with self.conversation_history() as history:
+            summary = (
+                await history.aget_summary()
+                if config.HISTORY_SUMMARY_ENABLED
+                else SessionSummary()
+            )
+            # Only the tail of the session that is not summarized yet is read
+            records = await history.aget_tail(
+                config.HISTORY_FETCH_LIMIT, after_id=summary.through_id
+            )
 
-        system_message_content = """You are a helpful assistant designed to provide accurate and relevant answers. Follow these guidelines:
-        1. Answer the user's question to the best of your ability in a clear, concise, and conversational tone.
-        2. If you don't know the answer, respond with "I don't know" and suggest how the user can find the information.
-        3. If the question is unclear, ask the user to clarify or provide more details.
-        4. Use the provided conversation history (the last 10 messages) to give contextually relevant answers.
-        5. You have access to tools to retrieve external information. Use them when the question requires up-to-date data, specific facts, or information beyond your knowledge.
-        6. If more context is needed, ask the user for additional details.
-        The user's question follows the history."""
+        system_message = SystemMessage(content=SYSTEM_PROMPT.strip())
+        self._has_summary = bool(summary.text)
+        if summary.text:
+            system_message = SystemMessage(
+                content=f"{system_message.content}\n\n{SUMMARY_HEADER}\n{summary.text}"
+            )
+        packed = pack_history(
+            [message for _, message in records],
+            budget_tokens=config.HISTORY_TOKEN_BUDGET - estimate_tokens(system_message),
+            tool_output_max_tokens=config.TOOL_OUTPUT_MAX_TOKENS,
+        )
+        context_stats.record_pack(packed)
+        # Older messages exist but were not sent: they belong in the summary
+        if config.HISTORY_SUMMARY_ENABLED and (
+            packed.dropped or len(records) >= config.HISTORY_FETCH_LIMIT
+        ):
+            self._fold_before_id = (
+                records[packed.dropped][0]
+                if packed.dropped < len(records)
+                else records[-1][0] + 1
+            )
+        recent_messages = packed.messages
 
-        old_context_messages = [
-            SystemMessage(content=system_message_content.strip()),
-            *last_10_messages,
-        ]
+        old_context_messages = [system_message, *recent_messages]
 
-        last_message = last_10_messages[-1] if last_10_messages else None
+        last_message = recent_messages[-1] if recent_messages else None
         human_assistance_tool_call_id = None
         human_assistance_tool_args = None
         if (
@@ -166,26 +259,256 @@ class Graph:
                 tool_call_id=human_assistance_tool_call_id,
             )
         else:
-            human_message = HumanMessage(content=question.strip())
+            text = (question or "").strip()
+            if attachments:
+                text = f"{text}\n\n{attachment_note(attachments)}".strip()
+            human_message = HumanMessage(content=text, id=str(uuid.uuid4()))
+
+        return old_context_messages, human_message
+
+    def _run_config(
+        self,
+        human_message: BaseMessage,
+        attachments: Optional[List[Attachment]] = None,
+    ) -> RunnableConfig:
+        return {
+            "configurable": {
+                "thread_id": self.thread_id,
+                "conversation_history": self.conversation_history,
+                "attachments": (
+                    {human_message.id: attachments}
+                    if attachments and isinstance(human_message, HumanMessage)
+                    else None
+                ),
+            }
+        }
+
+    async def _finalize(
+        self, old_context_messages: List[BaseMessage], messages: List[BaseMessage]
+    ) -> Tuple[str, List[str], List[str]]:
+        """Persist the messages produced by this turn and format the response."""
+        filtered_messages = [
+            message for message in messages if message not in old_context_messages
+        ]
 
+        async with self.conversation_history() as history:
+            await history.aadd_messages(filtered_messages)
+
+        return format_response_message(filtered_messages)
+
+    async def update_summary(self):
+        """
+        Fold the messages that no longer fit the context into the session summary.
+
+        Meant to run after the response has been sent; a no-op unless the last
+        prepared context left messages out. Each call folds at most
+        HISTORY_SUMMARY_BATCH_SIZE messages, oldest first.
+        """
+        if self._fold_before_id is None:
+            return
         try:
-            result = await self.graph.ainvoke(
-                {
-                    "messages": [*old_context_messages, human_message],
-                },
-                {"configurable": {"thread_id": self.thread_id}},
+            async with self.conversation_history() as history:
+                summary = await history.aget_summary()
+                records = await history.aget_range(
+                    summary.through_id,
+                    self._fold_before_id,
+                    limit=config.HISTORY_SUMMARY_BATCH_SIZE,
+                )
+            if not records:
+                return
+            text = await summarize(
+                summary.text,
+                [message for _, message in records],
+                max_words=config.HISTORY_SUMMARY_MAX_WORDS,
             )
+            async with self.conversation_history() as history:
+                await history.asave_summary(SessionSummary(text, records[-1][0]))
+            context_stats.record_summary(ok=True)
+        except Exception as e:
+            logger.warning(f"Failed to update the conversation summary: {e}")
+            context_stats.record_summary(ok=False)
 
-            filtered_messages = [
-                message
-                for message in result["messages"]
-                if message not in old_context_messages
-            ]
+    def _semantic_cache_for(
+        self,
+        old_context_messages: List[BaseMessage],
+        human_message: BaseMessage,
+        attachments: Optional[List[Attachment]],
+    ) -> Optional[SemanticCache]:
+        """
+        The semantic cache, if this turn may be answered from it.
+
+        Only self-contained questions qualify: the first turn of a session (no history
+        besides the system prompt, and no summary of folded turns), as plain text
+        without attachments. Call after _prepare_messages.
+        """
+        cache = get_semantic_cache()
+        if (
+            cache is None
+            or attachments
+            or self._has_summary
+            or len(old_context_messages) > 1
+            or not isinstance(human_message, HumanMessage)
+            or not human_message.content
+        ):
+            return None
+        return cache
+
+    async def _lookup_cached_answer(
+        self, cache: SemanticCache, human_message: HumanMessage
+    ) -> Tuple[Optional[CachedAnswer], Any]:
+        """Look the question up; on a hit, save the turn to history as usual."""
+        answer, vector = await asyncio.to_thread(cache.lookup, human_message.content)
+        if answer is not None:
+            async with self.conversation_history() as history:
+                await history.aadd_messages(
+                    [human_message, AIMessage(content=answer.message)]
+                )
+        return answer, vector
 
-            self.conversation_history.add_messages(filtered_messages)
+    @staticmethod
+    def _store_answer(
+        cache: SemanticCache,
+        human_message: HumanMessage,
+        vector,
+        messages: List[BaseMessage],
+        response: Tuple[str, List[str], List[str]],
+        started_at: float,
+    ):
+        # Only complete answers are reused, not turns waiting on a tool or a human
+        last_message = messages[-1] if messages else None
+        if isinstance(last_message, AIMessage) and not last_message.tool_calls:
+            cache.store(
+                human_message.content,
+                vector,
+                *response,
+                latency_seconds=time.perf_counter() - started_at,
+            )
 
-            return format_response_message(filtered_messages)
+    async def get_message(
+        self, question: Optional[str], attachments: Optional[List[Attachment]] = None
+    ) -> Tuple[str, List[str], List[str]]:
+        """
+        Invoke the graph to process a question and return all new messages in a structured format.
+
+        Args:
+            question (str): The user's question or message.
+            attachments (Optional[List[Attachment]]): Optional attachments related to the question.
+
+        Returns:
+            str: A structured string containing all new messages generated during processing.
+        """
+        old_context_messages, human_message = await self._prepare_messages(
+            question, attachments
+        )
+        cache = self._semantic_cache_for(
+            old_context_messages, human_message, attachments
+        )
+        if cache is not None:
+            answer, vector = await self._lookup_cached_answer(cache, human_message)
+            if answer is not None:
+                return answer.message, answer.resources, answer.images
+
+        started_at = time.perf_counter()
+        try:
+            result = await get_compiled_graph().ainvoke(
+                {"messages": [*old_context_messages, human_message]},
+                self._run_config(human_message, attachments),
+            )
+            response = await self._finalize(old_context_messages, result["messages"])
+            if cache is not None:
+                self._store_answer(
+                    cache,
+                    human_message,
+                    vector,
+                    result["messages"],
+                    response,
+                    started_at,
+                )
+            return response
 
         except Exception as e:
             logger.error(f"Error processing message: {e}")
             return f"Error: Failed to process message: {str(e)}", [], []
+
+    async def stream_message(
+        self, question: Optional[str], attachments: Optional[List[Attachment]] = None
+    ) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        Process a question like get_message, yielding progress events as they happen.
+
+        Args:
+            question (str): The user's question or message.
+            attachments (Optional[List[Attachment]]): Optional attachments related to the question.
+
+        Yields:
+            tuple: An (event, data) pair, one of:
+                - ("token", {"text"}): a text delta from the model.
+                - ("tool_start", {"name", "input"}) / ("tool_end", {"name"}): a tool call.
+                - ("done", {"message", "resources", "images"}): the final response, sent
+                  once history has been saved.
+                - ("error", {"error"}): processing failed; nothing was saved.
+        """
+        try:
+            old_context_messages, human_message = await self._prepare_messages(
+                question, attachments
+            )
+            cache = self._semantic_cache_for(
+                old_context_messages, human_message, attachments
+            )
+            if cache is not None:
+                answer, vector = await self._lookup_cached_answer(cache, human_message)
+                if answer is not None:
+                    yield "token", {"text": answer.message}
+                    yield "done", {
+                        "message": answer.message,
+                        "resources": answer.resources,
+                        "images": answer.images,
+                    }
+                    return
+
+            started_at = time.perf_counter()
+            final_state = None
+            async for event in get_compiled_graph().astream_events(
+                {"messages": [*old_context_messages, human_message]},
+                self._run_config(human_message, attachments),
+                version="v2",
+            ):
+                kind = event["event"]
+                if kind == "on_chat_model_stream":
+                    text = extract_text_delta(event["data"]["chunk"])
+                    if text:
+                        yield "token", {"text": text}
+                elif kind == "on_tool_start":
+                    yield "tool_start", {
+                        "name": event["name"],
+                        "input": event["data"].get("input"),
+                    }
+                elif kind == "on_tool_end":
+                    yield "tool_end", {"name": event["name"]}
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    # The root run's output is the graph's final state
+                    final_state = event["data"]["output"]
+
+            if final_state is None:
+                raise RuntimeError("Graph finished without a final state")
+            response, resources, images = await self._finalize(
+                old_context_messages, final_state["messages"]
+            )
+            if cache is not None:
+                self._store_answer(
+                    cache,
+                    human_message,
+                    vector,
+                    final_state["messages"],
+                    (response, resources, images),
+                    started_at,
+                )
+            yield "done", {
+                "message": response,
+                "resources": resources,
+                "images": images,
+            }
+
+        except Exception as e:
+            logger.error(f"Error streaming message: {e}")
+            yield "error", {"error": f"Failed to process message: {str(e)}"}
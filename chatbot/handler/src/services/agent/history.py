@@ -0,0 +1,138 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from langchain_core.messages import BaseMessage, messages_from_dict
+from langchain_postgres import PostgresChatMessageHistory
+from psycopg import sql
+
+# Table holding the rolling summary of each session (database.models.ChatSummary)
+SUMMARY_TABLE = "chat_summaries"
+
+
+@dataclass
+class SessionSummary:
+    """Summary of a session's messages up to and including `through_id`."""
+
+    text: str = ""
+    through_id: int = 0
+
+
+def _get_tail_query(table_name: str) -> sql.Composed:
+    """Make a SQL query returning the last `limit` messages after `after_id`, oldest first."""
+    return sql.SQL(
+        "SELECT id, message FROM ("
+        " SELECT id, message FROM {table_name}"
+        " WHERE session_id = %(session_id)s AND id > %(after_id)s"
+        " ORDER BY id DESC"
+        " LIMIT %(limit)s"
+        ") AS tail "
+        "ORDER BY id;"
+    ).format(table_name=sql.Identifier(table_name))
+
+
+def _get_range_query(table_name: str) -> sql.Composed:
+    """Make a SQL query returning the first `limit` messages between two ids."""
+    return sql.SQL(
+        "SELECT id, message FROM {table_name}"
+        " WHERE session_id = %(session_id)s"
+        " AND id > %(after_id)s AND id < %(before_id)s"
+        " ORDER BY id"
+        " LIMIT %(limit)s;"
+    ).format(table_name=sql.Identifier(table_name))
+
+
+class WindowedChatMessageHistory(PostgresChatMessageHistory):
+    """
+    PostgresChatMessageHistory that can read only the tail of a session, and keeps
+    the session's rolling summary.
+
+    Reads use the (session_id, id) index, so their cost does not grow with the length
+    of the session.
+    """
+
+    async def aget_tail(
+        self, limit: int, after_id: int = 0
+    ) -> List[Tuple[int, BaseMessage]]:
+        """
+        Retrieve at most `limit` of the most recent messages.
+
+        The tail may start in the middle of a turn; context.pack_history trims it to
+        start on a human message.
+
+        Args:
+            limit (int): Maximum number of messages to return.
+            after_id (int): Only return messages with a larger id (e.g. those not yet
+                folded into the summary).
+
+        Returns:
+            List[Tuple[int, BaseMessage]]: (id, message) pairs in chronological order.
+        """
+        return await self._afetch(
+            _get_tail_query(self._table_name), {"limit": limit, "after_id": after_id}
+        )
+
+    async def aget_range(
+        self, after_id: int, before_id: int, limit: int
+    ) -> List[Tuple[int, BaseMessage]]:
+        """Retrieve the first `limit` messages with after_id < id < before_id."""
+        return await self._afetch(
+            _get_range_query(self._table_name),
+            {"after_id": after_id, "before_id": before_id, "limit": limit},
+        )
+
+    async def aget_summary(self) -> SessionSummary:
+        """Return the session's summary (empty if there is none yet)."""
+        query = sql.SQL(
+            "SELECT summary, summarized_through_id FROM {table}"
+            " WHERE session_id = %(session_id)s;"
+        ).format(table=sql.Identifier(SUMMARY_TABLE))
+        async with self._require_aconnection().cursor() as cursor:
+            await cursor.execute(query, {"session_id": self._session_id})
+            row = await cursor.fetchone()
+        return SessionSummary(*row) if row else SessionSummary()
+
+    async def asave_summary(self, summary: SessionSummary):
+        """
+        Store the session's summary.
+
+        A summary covering fewer messages than the stored one is ignored, so
+        concurrent updates never move the summary backwards.
+        """
+        query = sql.SQL(
+            "INSERT INTO {table}"
+            " (session_id, summary, summarized_through_id, updated_at)"
+            " VALUES (%(session_id)s, %(summary)s, %(through_id)s,"
+            " now() AT TIME ZONE 'utc')"
+            " ON CONFLICT (session_id) DO UPDATE SET"
+            " summary = EXCLUDED.summary,"
+            " summarized_through_id = EXCLUDED.summarized_through_id,"
+            " updated_at = EXCLUDED.updated_at"
+            " WHERE {table}.summarized_through_id < EXCLUDED.summarized_through_id;"
+        ).format(table=sql.Identifier(SUMMARY_TABLE))
+        connection = self._require_aconnection()
+        async with connection.cursor() as cursor:
+            await cursor.execute(
+                query,
+                {
+                    "session_id": self._session_id,
+                    "summary": summary.text,
+                    "through_id": summary.through_id,
+                },
+            )
+        await connection.commit()
+
+    async def _afetch(
+        self, query: sql.Composed, params: dict
+    ) -> List[Tuple[int, BaseMessage]]:
+        async with self._require_aconnection().cursor() as cursor:
+            await cursor.execute(query, {"session_id": self._session_id, **params})
+            records = await cursor.fetchall()
+        messages = messages_from_dict([record[1] for record in records])
+        return [(record[0], message) for record, message in zip(records, messages)]
+
+    def _require_aconnection(self):
+        if self._aconnection is None:
+            raise ValueError(
+                "Please initialize the WindowedChatMessageHistory with an async connection."
+            )
+        return self._aconnection
@@ -1,10 +1,15 @@
 from langchain_aws import ChatBedrockConverse
 
 from config.config import config
+from config.lazy import lazy
 
-llm = ChatBedrockConverse(
-    model=config.AWS_BEDROCK_MODEL_ID,
-    temperature=0,
-    max_tokens=None,
-    region_name=config.AWS_REGION_NAME,
-)
+
+@lazy
+def get_llm() -> ChatBedrockConverse:
+    """Bedrock chat model, built on first use."""
+    return ChatBedrockConverse(
+        model=config.AWS_BEDROCK_MODEL_ID,
+        temperature=0,
+        max_tokens=None,
+        region_name=config.AWS_REGION_NAME,
+    )
@@ -0,0 +1,176 @@
+import asyncio
+import threading
+from typing import Any, Literal
+
+import httpx
+from langchain_community.utilities import GoogleSerperAPIWrapper
+from langchain_tavily import TavilySearch
+from langchain_tavily._utilities import TAVILY_API_URL, TavilySearchAPIWrapper
+
+from config.config import config
+from config.lazy import lazy
+
+SERPER_API_URL = "https://google.serper.dev"
+
+
+def _client_kwargs() -> dict:
+    return {
+        "timeout": config.SEARCH_HTTP_TIMEOUT_SECONDS,
+        "limits": httpx.Limits(
+            max_connections=config.SEARCH_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=config.SEARCH_HTTP_MAX_CONNECTIONS,
+            keepalive_expiry=config.SEARCH_HTTP_KEEPALIVE_SECONDS,
+        ),
+    }
+
+
+@lazy
+def get_http_client() -> httpx.Client:
+    """Keep-alive HTTP client shared by every sync search call in the process."""
+    return httpx.Client(**_client_kwargs())
+
+
+_async_http_clients: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Keep-alive HTTP client shared by async search calls.
+
+    An AsyncClient's connections belong to the event loop that opened them, so one
+    client is kept per loop; in practice the handler runs a single loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_http_clients.get(loop)
+    if client is None or client.is_closed:
+        for stale in [other for other in _async_http_clients if other.is_closed()]:
+            del _async_http_clients[stale]
+        client = httpx.AsyncClient(**_client_kwargs())
+        _async_http_clients[loop] = client
+    return client
+
+
+class PooledTavilySearchAPIWrapper(TavilySearchAPIWrapper):
+    """
+    TavilySearchAPIWrapper sending its requests over the shared keep-alive clients.
+
+    The upstream wrapper posts with a new requests/aiohttp session per call. Request
+    parameters, headers and errors are the same as upstream; TavilySearch still builds
+    the parameters and handles empty results.
+    """
+
+    def raw_results(self, query: str, **kwargs: Any) -> dict:
+        response = get_http_client().post(**self._request(query, kwargs))
+        return self._parse(response)
+
+    async def raw_results_async(self, query: str, **kwargs: Any) -> dict:
+        response = await get_async_http_client().post(**self._request(query, kwargs))
+        return self._parse(response)
+
+    def _request(self, query: str, params: dict) -> dict:
+        return {
+            "url": f"{self.api_base_url or TAVILY_API_URL}/search",
+            "headers": {
+                "Authorization": f"Bearer {self.tavily_api_key.get_secret_value()}",
+                "Content-Type": "application/json",
+                "X-Client-Source": "langchain-tavily",
+            },
+            "json": {
+                key: value
+                for key, value in {"query": query, **params}.items()
+                if value is not None
+            },
+        }
+
+    @staticmethod
+    def _parse(response: httpx.Response) -> dict:
+        if response.status_code != 200:
+            detail = response.json().get("detail", {})
+            error_message = (
+                detail.get("error") if isinstance(detail, dict) else "Unknown error"
+            )
+            raise ValueError(f"Error {response.status_code}: {error_message}")
+        return response.json()
+
+
+class PooledGoogleSerperAPIWrapper(GoogleSerperAPIWrapper):
+    """GoogleSerperAPIWrapper sending its requests over the shared keep-alive clients."""
+
+    def _google_serper_api_results(
+        self, search_term: str, search_type: str = "search", **kwargs: Any
+    ) -> dict:
+        response = get_http_client().post(
+            **self._request(search_term, search_type, kwargs)
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def _async_google_serper_search_results(
+        self, search_term: str, search_type: str = "search", **kwargs: Any
+    ) -> dict:
+        response = await get_async_http_client().post(
+            **self._request(search_term, search_type, kwargs)
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _request(self, search_term: str, search_type: str, params: dict) -> dict:
+        # Serper takes the search parameters in the query string, as upstream sends them
+        return {
+            "url": f"{SERPER_API_URL}/{search_type}",
+            "headers": {
+                "X-API-KEY": self.serper_api_key or "",
+                "Content-Type": "application/json",
+            },
+            "params": {
+                "q": search_term,
+                **{key: value for key, value in params.items() if value is not None},
+            },
+        }
+
+
+@lazy
+def get_tavily_api_wrapper() -> PooledTavilySearchAPIWrapper:
+    return PooledTavilySearchAPIWrapper(tavily_api_key=config.TAVILY_API_KEY)
+
+
+_tavily_clients: dict[tuple, TavilySearch] = {}
+_tavily_clients_lock = threading.Lock()
+
+
+def get_tavily_client(
+    topic: Literal["general", "news", "finance"] = "general",
+    include_images: bool = False,
+    search_depth: Literal["basic", "advanced"] = "basic",
+    max_results: int = 5,
+) -> TavilySearch:
+    """Return the shared TavilySearch tool for a search configuration, creating it once."""
+    key = (topic, include_images, search_depth, max_results)
+    client = _tavily_clients.get(key)
+    if client is None:
+        with _tavily_clients_lock:
+            client = _tavily_clients.get(key)
+            if client is None:
+                client = TavilySearch(
+                    max_results=max_results,
+                    topic=topic,
+                    include_images=include_images,
+                    search_depth=search_depth,
+                    api_wrapper=get_tavily_api_wrapper(),
+                )
+                _tavily_clients[key] = client
+    return client
+
+
+@lazy
+def get_serper_client() -> PooledGoogleSerperAPIWrapper:
+    return PooledGoogleSerperAPIWrapper(serper_api_key=config.SERPER_API_KEY)
+
+
+def search_client_stats() -> dict:
+    """Return which shared clients exist, for /metrics."""
+    return {
+        "tavily_configs": len(_tavily_clients),
+        "sync_http_client": get_http_client.initialized,
+        "async_http_clients": len(_async_http_clients),
+    }
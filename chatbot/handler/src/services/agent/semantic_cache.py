@@ -0,0 +1,203 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional, Protocol, Tuple
+
+import numpy as np
+
+from config.config import config
+from config.lazy import lazy
+
+# Filler words that do not change what a question asks. Question words (when vs
+# where) and negations do, so they are kept as features.
+STOPWORDS = frozenset(
+    "a an the is are was were be tell me about please can could would you explain "
+    "describe give i do does of to in on for and or it this that".split()
+)
+
+
+class Embedder(Protocol):
+    """Turns text into a vector; similar questions should get similar vectors."""
+
+    def embed(self, text: str) -> List[float]: ...
+
+
+class HashingEmbedder:
+    """
+    Local, deterministic embedder: hashed unigrams and bigrams of the content words.
+
+    Needs no model or network call, which makes it suitable for tests and as a
+    near-duplicate detector; use a model embedder for paraphrases.
+    """
+
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+
+    def embed(self, text: str) -> List[float]:
+        words = [w for w in re.findall(r"\w+", text.casefold()) if w not in STOPWORDS]
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.dimensions] += 1.0 if value >> 63 else -1.0
+        return vector.tolist()
+
+
+class LangChainEmbedder:
+    """Adapter for any LangChain Embeddings implementation (e.g. BedrockEmbeddings)."""
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+
+    def embed(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+
+@dataclass
+class CachedAnswer:
+    message: str
+    resources: List[str]
+    images: List[str]
+    latency_seconds: float = 0.0
+    expires_at: float = field(default=0.0, repr=False)
+
+
+class SemanticCache:
+    """
+    Maps first-turn questions to stored answers by embedding similarity.
+
+    Lookups first try the normalized question text, then the most similar stored
+    question whose cosine similarity reaches `threshold`. Entries expire after
+    `ttl_seconds`; beyond `max_entries` the least recently used one is evicted.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        threshold: float = 0.9,
+        ttl_seconds: float = 3600,
+        max_entries: int = 1000,
+    ):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # normalized question -> (unit vector, answer), in LRU order
+        self._entries: OrderedDict[str, Tuple[np.ndarray, CachedAnswer]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def normalize(question: str) -> str:
+        return " ".join(re.findall(r"\w+", question.casefold()))
+
+    def lookup(self, question: str) -> Tuple[Optional[CachedAnswer], np.ndarray]:
+        """
+        Find a stored answer for a question.
+
+        Returns:
+            tuple: The answer (or None) and the question's vector, to pass to store().
+        """
+        normalized = self.normalize(question)
+        vector = self._unit(self.embedder.embed(question))
+        now = time.monotonic()
+        with self._lock:
+            for key in [
+                k for k, (_, a) in self._entries.items() if a.expires_at <= now
+            ]:
+                del self._entries[key]
+
+            match = normalized if normalized in self._entries else None
+            if match is None and self._entries:
+                keys = list(self._entries)
+                matrix = np.stack([self._entries[k][0] for k in keys])
+                scores = matrix @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    match = keys[best]
+
+            if match is None:
+                self.misses += 1
+                return None, vector
+            self._entries.move_to_end(match)
+            answer = self._entries[match][1]
+            self.hits += 1
+            self.saved_seconds += answer.latency_seconds
+            return answer, vector
+
+    def store(
+        self,
+        question: str,
+        vector: np.ndarray,
+        message: str,
+        resources: List[str],
+        images: List[str],
+        latency_seconds: float,
+    ):
+        """Remember the answer to a question, with the time it took to produce."""
+        answer = CachedAnswer(
+            message=message,
+            resources=resources,
+            images=images,
+            latency_seconds=latency_seconds,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        with self._lock:
+            self._entries[self.normalize(question)] = (vector, answer)
+            self._entries.move_to_end(self.normalize(question))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": True,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "saved_seconds": round(self.saved_seconds, 3),
+            }
+
+    @staticmethod
+    def _unit(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+
+def _build_embedder() -> Embedder:
+    if config.SEMANTIC_CACHE_EMBEDDER == "bedrock":
+        from langchain_aws import BedrockEmbeddings
+
+        return LangChainEmbedder(
+            BedrockEmbeddings(
+                model_id=config.SEMANTIC_CACHE_EMBEDDING_MODEL_ID,
+                region_name=config.AWS_REGION_NAME,
+            )
+        )
+    return HashingEmbedder()
+
+
+@lazy
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """The process-wide semantic cache, or None unless SEMANTIC_CACHE_ENABLED is set."""
+    if not config.SEMANTIC_CACHE_ENABLED:
+        return None
+    return SemanticCache(
+        _build_embedder(),
+        threshold=config.SEMANTIC_CACHE_THRESHOLD,
+        ttl_seconds=config.SEMANTIC_CACHE_TTL_SECONDS,
+        max_entries=config.SEMANTIC_CACHE_MAX_ENTRIES,
+    )
+
+
+def semantic_cache_stats() -> dict:
+    cache = get_semantic_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Optional
+
+from redis.exceptions import RedisError
+
+from config.cache import TTLCache
+from config.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Seconds a search result stays fresh; recent and news results go stale quickly
+TTL_BY_TIME_RANGE = {
+    "day": 300,
+    "week": 1800,
+    "month": 6 * 3600,
+    "year": 24 * 3600,
+}
+TTL_BY_TOPIC = {
+    "news": 600,
+    "finance": 600,
+}
+DEFAULT_TTL = 6 * 3600
+
+
+def tool_cache_ttl(
+    topic: Optional[str] = None, time_range: Optional[str] = None
+) -> int:
+    """Pick a TTL from the search's time range, then its topic."""
+    if time_range in TTL_BY_TIME_RANGE:
+        return TTL_BY_TIME_RANGE[time_range]
+    return TTL_BY_TOPIC.get(topic, DEFAULT_TTL)
+
+
+class ToolResultCache:
+    """
+    Two-tier cache for web-search tool results.
+
+    Results are looked up in an in-process LRU first, then (on the async path) in
+    Redis, shared by all Lambda instances. Keys are derived from the tool name, the
+    normalized query and the remaining search parameters. Redis failures are logged
+    and treated as misses.
+    """
+
+    def __init__(self, max_entries: int = 512, prefix: str = "toolcache"):
+        self.local = TTLCache(max_entries=max_entries)
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def make_key(self, tool_name: str, query: str, **params) -> str:
+        """Build a cache key; queries differing only in case or spacing share a key."""
+        normalized = " ".join(query.casefold().split())
+        payload = json.dumps({"q": normalized, **params}, sort_keys=True, default=str)
+        digest = hashlib.sha256(payload.encode()).hexdigest()
+        return f"{self.prefix}:{tool_name}:{digest}"
+
+    def get_or_call(
+        self,
+        tool_name: str,
+        query: str,
+        fetch: Callable[[], Any],
+        ttl_seconds: int = DEFAULT_TTL,
+        **params,
+    ) -> Any:
+        """
+        Return the cached result for a tool call, or call `fetch` and cache its result.
+
+        This sync path only uses the in-process tier; the agent's async path
+        (aget_or_call) also shares results through Redis.
+
+        Args:
+            tool_name (str): Name of the tool, part of the key.
+            query (str): The search query, normalized for the key.
+            fetch (Callable[[], Any]): Performs the real call on a miss.
+            ttl_seconds (int): How long a fresh result is kept.
+            **params: Other parameters that change the result (topic, time_range...).
+        """
+        key = self.make_key(tool_name, query, **params)
+        cached = self.local.get(key)
+        if cached is not None:
+            self._count("local_hits")
+            return cached
+        self._count("misses")
+        result = fetch()
+        if self._cacheable(result):
+            self.local.set(key, result, ttl_seconds)
+        return result
+
+    async def aget_or_call(
+        self,
+        tool_name: str,
+        query: str,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl_seconds: int = DEFAULT_TTL,
+        **params,
+    ) -> Any:
+        """Async version of get_or_call; `fetch` returns an awaitable."""
+        key = self.make_key(tool_name, query, **params)
+        cached = await self._lookup(key, ttl_seconds)
+        if cached is not None:
+            return cached
+        result = await fetch()
+        await self._store(key, result, ttl_seconds)
+        return result
+
+    async def _lookup(self, key: str, ttl_seconds: int) -> Any:
+        cached = self.local.get(key)
+        if cached is not None:
+            self._count("local_hits")
+            return cached
+
+        try:
+            cached = await redis_client.get_json(key)
+        except RedisError as e:
+            logger.warning(f"Tool cache read failed: {e}")
+            cached = None
+        if cached is not None:
+            self._count("redis_hits")
+            self.local.set(key, cached, ttl_seconds)
+            return cached
+
+        self._count("misses")
+        return None
+
+    async def _store(self, key: str, result: Any, ttl_seconds: int):
+        if not self._cacheable(result):
+            return
+        self.local.set(key, result, ttl_seconds)
+        try:
+            await redis_client.store_json(key, result, ttl_seconds)
+        except (RedisError, TypeError) as e:
+            logger.warning(f"Tool cache write failed: {e}")
+
+    @staticmethod
+    def _cacheable(result: Any) -> bool:
+        # Only raw API responses are cached: tool wrappers report failures as
+        # {"error": ...} or, for handled tool errors such as no results, as a message
+        return isinstance(result, dict) and "error" not in result
+
+    def stats(self) -> dict:
+        """Return hit/miss counters per tier."""
+        with self._lock:
+            lookups = self.local_hits + self.redis_hits + self.misses
+            hits = self.local_hits + self.redis_hits
+            return {
+                "local_hits": self.local_hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else None,
+                "local_entries": len(self.local),
+            }
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+tool_result_cache = ToolResultCache()
@@ -1,19 +1,32 @@
-import os
 from typing import List, Literal, Optional
 
-from langchain_tavily import TavilySearch
 from langchain_core.tools import Tool, BaseTool, StructuredTool, tool
-from langchain_community.utilities import GoogleSerperAPIWrapper
+from langchain_tavily import TavilySearch
 from langgraph.types import interrupt
 from pydantic import BaseModel, Field
 
-from config.config import config
+from .search_clients import get_serper_client, get_tavily_client
+from .tool_cache import tool_result_cache, tool_cache_ttl
+
+
+def google_search_func(query: str) -> dict:
+    """Run a Google search through Serper and return the raw results."""
+    return tool_result_cache.get_or_call(
+        "google_search",
+        query,
+        lambda: get_serper_client().results(query),
+        ttl_seconds=tool_cache_ttl(),
+    )
 
-os.environ["SERPER_API_KEY"] = config.SERPER_API_KEY
-os.environ["TAVILY_API_KEY"] = config.TAVILY_API_KEY
 
-# Google search instance (unchanged)
-search_1 = GoogleSerperAPIWrapper()
+async def agoogle_search_func(query: str) -> dict:
+    """Async version of google_search_func."""
+    return await tool_result_cache.aget_or_call(
+        "google_search",
+        query,
+        lambda: get_serper_client().aresults(query),
+        ttl_seconds=tool_cache_ttl(),
+    )
 
 
 def create_tavily_search(
@@ -22,7 +35,10 @@ def create_tavily_search(
     time_range: Optional[Literal["day", "week", "month", "year"]] = None,
     search_depth: Literal["basic", "advanced"] = "basic",
 ) -> TavilySearch:
-    """Creates and returns a new TavilySearch instance with configured parameters.
+    """Returns the shared TavilySearch instance for the given search parameters.
+
+    Instances are pooled per configuration and send requests over process-wide
+    keep-alive HTTP connections, so repeated searches skip the TLS handshake.
 
     Args:
         topic (Literal["general", "news", "finance"]): The topic for the search, defaults to "general".
@@ -42,11 +58,8 @@ def create_tavily_search(
         raise ValueError("Time range must be one of 'day', 'week', 'month', or 'year'")
     if search_depth not in ["basic", "advanced"]:
         raise ValueError("Search depth must be one of 'basic' or 'advanced'")
-    return TavilySearch(
-        max_results=5,
-        topic=topic,
-        include_images=include_images,
-        search_depth=search_depth,
+    return get_tavily_client(
+        topic=topic, include_images=include_images, search_depth=search_depth
     )
 
 
@@ -74,6 +87,16 @@ class TavilySearchInput(BaseModel):
     )
 
 
+def _tavily_cache_params(topic, include_images, time_range, search_depth) -> dict:
+    return {
+        "ttl_seconds": tool_cache_ttl(topic, time_range),
+        "topic": topic,
+        "include_images": include_images,
+        "time_range": time_range,
+        "search_depth": search_depth,
+    }
+
+
 # Define the tavily_search tool with a structured input schema
 def tavily_search_func(
     query: str,
@@ -81,20 +104,44 @@ def tavily_search_func(
     include_images: bool = False,
     time_range: Optional[str] = None,
     search_depth: Literal["basic", "advanced"] = "basic",
-) -> str:
+) -> dict:
     """Run a Tavily search with the specified query, topic, image inclusion, time range, and search depth."""
     if not query:
         raise ValueError("Query cannot be empty")
+    client = create_tavily_search(topic, include_images, time_range, search_depth)
     # Append time range to query if specified
-    if time_range:
-        query = f"{query} past {time_range}"
-    return create_tavily_search(topic, include_images, time_range, search_depth).run(
-        query
+    search_query = f"{query} past {time_range}" if time_range else query
+    return tool_result_cache.get_or_call(
+        "tavily_search",
+        query,
+        lambda: client.run(search_query),
+        **_tavily_cache_params(topic, include_images, time_range, search_depth),
+    )
+
+
+async def atavily_search_func(
+    query: str,
+    topic: Literal["general", "news", "finance"] = "general",
+    include_images: bool = False,
+    time_range: Optional[str] = None,
+    search_depth: Literal["basic", "advanced"] = "basic",
+) -> dict:
+    """Async version of tavily_search_func."""
+    if not query:
+        raise ValueError("Query cannot be empty")
+    client = create_tavily_search(topic, include_images, time_range, search_depth)
+    search_query = f"{query} past {time_range}" if time_range else query
+    return await tool_result_cache.aget_or_call(
+        "tavily_search",
+        query,
+        lambda: client.arun(search_query),
+        **_tavily_cache_params(topic, include_images, time_range, search_depth),
     )
 
 
 tavily_search_tool = StructuredTool.from_function(
     func=tavily_search_func,
+    coroutine=atavily_search_func,
     name="tavily_search",
     description="Provides curated, concise web results optimized for AI, ideal for quick, relevant answers or content "
     "generation. Supports topics: general, news, finance. Optionally includes image search results, "
@@ -105,10 +152,14 @@ tavily_search_tool = StructuredTool.from_function(
 TOOLS: List[Tool | BaseTool] = [
     Tool(
         name="google_search",
-        func=search_1.results,
+        func=google_search_func,
+        coroutine=agoogle_search_func,
         description="Fetches raw, detailed Google search results (URLs, titles, snippets) for broad web data analysis "
         "or research.",
     ),
     tavily_search_tool,
     human_assistance,
 ]
+
+# Precomputed lookup used by the agent's tools node
+TOOLS_BY_NAME = {tool.name: tool for tool in TOOLS}
@@ -1,66 +1,104 @@
-import logging
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
-from langchain_core.messages import BaseMessage, ToolMessage, AIMessage
+from langchain_core.messages import BaseMessage, ToolMessage, AIMessage, AIMessageChunk
 
-logger = logging.getLogger(__name__)
 
+def build_tool_artifact(tool_name: str, tool_result) -> Optional[dict]:
+    """
+    Normalize a search tool's raw response into a structured artifact.
 
-def format_tool_message(tool_call: dict, tool_result: dict) -> str:
-    if tool_call["name"] == "tavily_search":
-        query = tool_result.get("query", "Unknown query")
-        results = tool_result.get("results", [])
-        images = tool_result.get("images", [])
-        formatted_result = f"Search query: {query}\n\nSearch Results:\n"
-        for i, result in enumerate(results, 1):
-            formatted_result += (
-                f"{i}. Title: {result.get('title', 'N/A')}\n"
-                f"   URL: {result.get('url', 'N/A')}\n"
-                f"   Content: {result.get('content', 'N/A')}\n"
-                f"   Score: {result.get('score', 'N/A')}\n\n"
-            )
-        if images:
-            formatted_result += "Images:\n"
-            for i, image in enumerate(images, 1):
-                formatted_result += f"{i}. Image URL: {image}\n"
-    elif tool_call["name"] == "google_search":
-        search_params = tool_result.get("searchParameters", {})
-        query = search_params.get("q", "Unknown query")
-        knowledge_graph = tool_result.get("knowledgeGraph", {})
-        organic_results = tool_result.get("organic", [])
-        people_also_ask = tool_result.get("peopleAlsoAsk", [])
+    Returns:
+        dict: {"query", "results": [{"title", "url", "content", "score"}], "images"}
+        plus "knowledge_graph" and "people_also_ask" for Google; None for other tools.
+    """
+    if not isinstance(tool_result, dict):
+        return None
+    if tool_name == "tavily_search":
+        return {
+            "query": tool_result.get("query", "Unknown query"),
+            "results": [
+                {
+                    "title": result.get("title", "N/A"),
+                    "url": result.get("url", ""),
+                    "content": result.get("content", ""),
+                    "score": result.get("score"),
+                }
+                for result in tool_result.get("results", [])
+            ],
+            # Image results are URLs, or dicts when descriptions are requested
+            "images": [
+                image.get("url", "") if isinstance(image, dict) else image
+                for image in tool_result.get("images", [])
+            ],
+        }
+    if tool_name == "google_search":
+        knowledge_graph = tool_result.get("knowledgeGraph") or {}
+        return {
+            "query": tool_result.get("searchParameters", {}).get("q", "Unknown query"),
+            "results": [
+                {
+                    "title": result.get("title", "N/A"),
+                    "url": result.get("link", ""),
+                    "content": result.get("snippet", ""),
+                    "score": None,
+                }
+                for result in tool_result.get("organic", [])
+            ],
+            "images": [],
+            "knowledge_graph": {
+                key: knowledge_graph[key]
+                for key in ("title", "type", "description", "website")
+                if key in knowledge_graph
+            },
+            "people_also_ask": [
+                {
+                    "question": item.get("question", ""),
+                    "answer": item.get("snippet", ""),
+                }
+                for item in tool_result.get("peopleAlsoAsk", [])
+            ],
+        }
+    return None
 
-        formatted_result = f"Search query: {query}\n\n"
 
-        if knowledge_graph:
-            formatted_result += "Knowledge Graph:\n"
-            formatted_result += (
-                f"  Title: {knowledge_graph.get('title', 'N/A')}\n"
-                f"  Type: {knowledge_graph.get('type', 'N/A')}\n"
-                f"  Description: {knowledge_graph.get('description', 'N/A')}\n"
-                f"  Website: {knowledge_graph.get('website', 'N/A')}\n\n"
-            )
+def format_tool_message(artifact: Optional[dict], tool_result) -> str:
+    """
+    Build the compact text the model sees for a tool result.
 
-        if organic_results:
-            formatted_result += "Organic Results:\n"
-            for i, result in enumerate(organic_results, 1):
-                formatted_result += (
-                    f"{i}. Title: {result.get('title', 'N/A')}\n"
-                    f"   URL: {result.get('link', 'N/A')}\n"
-                    f"   Snippet: {result.get('snippet', 'N/A')}\n\n"
-                )
+    Args:
+        artifact (Optional[dict]): The structured result from build_tool_artifact.
+        tool_result: The raw result, used as-is for tools without an artifact.
+    """
+    if artifact is None:
+        return str(tool_result)
 
-        if people_also_ask:
-            formatted_result += "People Also Ask:\n"
-            for i, item in enumerate(people_also_ask, 1):
-                formatted_result += (
-                    f"{i}. Question: {item.get('question', 'N/A')}\n"
-                    f"   Answer: {item.get('snippet', 'N/A')}\n\n"
-                )
-    else:
-        formatted_result = str(tool_result)
+    lines = [f"Search query: {artifact['query']}"]
+    knowledge_graph = artifact.get("knowledge_graph")
+    if knowledge_graph:
+        lines.append(
+            "Knowledge graph: "
+            + "; ".join(f"{key}: {value}" for key, value in knowledge_graph.items())
+        )
+    for i, result in enumerate(artifact["results"], 1):
+        lines.append(
+            f"{i}. {result['title']} ({result['url']})\n   {result['content']}"
+        )
+    for item in artifact.get("people_also_ask", []):
+        lines.append(f"Q: {item['question']}\n   A: {item['answer']}")
+    if artifact["images"]:
+        lines.append("Images: " + ", ".join(artifact["images"]))
+    return "\n".join(lines)
 
-    return formatted_result
+
+def extract_text_delta(chunk: AIMessageChunk) -> str:
+    """Return the text in a streamed model chunk, skipping tool-use deltas."""
+    if isinstance(chunk.content, str):
+        return chunk.content
+    return "".join(
+        block.get("text", "")
+        for block in chunk.content
+        if isinstance(block, dict) and block.get("type") == "text"
+    )
 
 
 def format_response_message(
@@ -79,6 +117,7 @@ def format_response_message(
         tuple: A tuple containing:
             - str: The formatted string representation of the messages.
             - List[str]: A list of URLs extracted from search results.
+            - List[str]: A list of image URLs from search results.
     """
     response_parts = []
     search_resources = []
@@ -105,77 +144,28 @@ def format_response_message(
             else:
                 response_parts.append(f"{message.content}\n")
         elif isinstance(message, ToolMessage):
-            if message.name == "tavily_search":
-                lines = message.content.split("\n")
-                formatted_results = ""
-                # Process each result block
-                result_blocks = message.content.split("\n\n")
-                logger.info(f"Result blocks: {result_blocks}")
-                for block in result_blocks:
-                    if block.strip():
-                        result_lines = block.split("\n")
-                        logger.info(f"Result lines: {result_lines}")
-                        # Ensure the block has enough lines and contains a URL
-                        if (
-                            len(result_lines) >= 4
-                            and "URL:" in result_lines[1]
-                            and "Score:" in result_lines[3]
-                            and "Content:" in result_lines[2]
-                        ):
-                            title = result_lines[0].split("Title: ", 1)[1].strip()
-                            url = result_lines[1].split("URL: ", 1)[1].strip()
-                            content = result_lines[2].split("Content: ", 1)[1].strip()
-                            score = result_lines[3].split("Score: ", 1)[1].strip()
-                            formatted_results += (
-                                f"- **Title:** {title}\n"
-                                f"  - **URL:** {url}\n"
-                                f"  - **Content:** {content}\n"
-                                f"  - **Score:** {score}\n"
-                            )
-                            if url and url.startswith("http"):
-                                search_resources.append(url)
-                        else:
-                            for line in result_lines:
-                                if "Image URL:" in line:
-                                    image_url = line.split("Image URL: ", 1)[1].strip()
-                                    if image_url and image_url.startswith("http"):
-                                        images.append(image_url)
-
-                if formatted_results and include_tool_message:
-                    query = lines[0].replace("Search query: ", "").strip()
-                    response_parts.append(
-                        f"### Search Results\n**Query:** {query}\n\n{formatted_results}\n"
-                    )
-            elif message.name == "google_search":
-                lines = message.content.split("\n")
+            artifact = message.artifact
+            if isinstance(artifact, dict) and "results" in artifact:
                 formatted_results = ""
-                current_section = ""
-                for line in lines[2:]:
-                    if line in [
-                        "Knowledge Graph:",
-                        "Organic Results:",
-                        "People Also Ask:",
-                    ]:
-                        current_section = line
-                        formatted_results += f"**{line.strip(':')}**\n"
-                    elif current_section == "Knowledge Graph:":
-                        formatted_results += f"{line.strip()}\n"
-                    elif current_section == "Organic Results:":
-                        if line.startswith(tuple(f"{i}. " for i in range(1, 10))):
-                            formatted_results += f"{line}\n"
-                        elif line.startswith("   URL: "):
-                            url = line.replace("   URL: ", "").strip()
-                            if url and url.startswith("http"):
-                                search_resources.append(url)
-                            formatted_results += f"  {line}\n"
-                        else:
-                            formatted_results += f"  {line}\n"
-                    elif current_section == "People Also Ask:":
-                        formatted_results += f"{line}\n"
-                if formatted_results and include_tool_message:
-                    query = lines[0].replace("Search query: ", "").strip()
+                for result in artifact["results"]:
+                    url = result["url"]
+                    if url and url.startswith("http"):
+                        search_resources.append(url)
+                    if include_tool_message:
+                        formatted_results += (
+                            f"- **Title:** {result['title']}\n"
+                            f"  - **URL:** {url}\n"
+                            f"  - **Content:** {result['content']}\n"
+                        )
+                images.extend(
+                    image
+                    for image in artifact.get("images", [])
+                    if image and image.startswith("http")
+                )
+                if formatted_results:
                     response_parts.append(
-                        f"### Search Results\n**Query:** {query}\n\n{formatted_results}\n"
+                        f"### Search Results\n**Query:** {artifact['query']}\n\n"
+                        f"{formatted_results}\n"
                     )
             elif include_tool_message:
                 response_parts.append(
@@ -0,0 +1,8 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+# config.config reads the secret's ARN at import time; tests never fetch the secret
+os.environ.setdefault(
+    "SECRET_ARN", "arn:aws:secretsmanager:ap-southeast-2:000000000000:secret:test"
+)
@@ -0,0 +1,68 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from services.agent.context import OMITTED_TOOL_OUTPUT, pack_history
+
+
+def tool_turn(question: str, output: str, answer: str, call_id: str) -> list:
+    return [
+        HumanMessage(content=question),
+        AIMessage(
+            content="",
+            tool_calls=[
+                {"name": "tavily_search", "args": {"query": question}, "id": call_id}
+            ],
+        ),
+        ToolMessage(content=output, name="tavily_search", tool_call_id=call_id),
+        AIMessage(content=answer),
+    ]
+
+
+def test_tail_starting_mid_turn_is_trimmed_to_a_human_message():
+    messages = [
+        ToolMessage(content="orphan", tool_call_id="x"),
+        AIMessage(content="end of a folded turn"),
+        HumanMessage(content="q1"),
+        AIMessage(content="a1"),
+    ]
+
+    packed = pack_history(messages, budget_tokens=1000, tool_output_max_tokens=100)
+
+    assert isinstance(packed.messages[0], HumanMessage)
+    assert packed.dropped == 2
+
+
+def test_tail_without_a_human_message_keeps_no_history():
+    messages = [AIMessage(content="a0"), AIMessage(content="a1")]
+
+    packed = pack_history(messages, budget_tokens=1000, tool_output_max_tokens=100)
+
+    assert packed.messages == []
+    assert packed.dropped == 2
+
+
+def test_tool_outputs_are_shrunk_before_turns_are_dropped():
+    messages = [
+        *tool_turn("q1", "R" * 2000, "a1", "call-1"),
+        HumanMessage(content="q2"),
+        AIMessage(content="a2"),
+    ]
+
+    packed = pack_history(messages, budget_tokens=60, tool_output_max_tokens=100)
+
+    assert packed.dropped == 0
+    assert packed.truncated_tool_outputs == 1
+    assert packed.messages[2].content == OMITTED_TOOL_OUTPUT
+
+
+def test_oldest_turns_are_dropped_when_over_budget():
+    messages = [
+        HumanMessage(content="q1 " * 100),
+        AIMessage(content="a1 " * 100),
+        HumanMessage(content="q2"),
+        AIMessage(content="a2"),
+    ]
+
+    packed = pack_history(messages, budget_tokens=50, tool_output_max_tokens=100)
+
+    assert [m.content for m in packed.messages] == ["q2", "a2"]
+    assert packed.dropped == 2
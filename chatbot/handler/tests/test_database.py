@@ -0,0 +1,31 @@
+from sqlalchemy import create_engine, text
+
+from database.database import backfill_s3_keys, s3_key_from_url
+
+BUCKET_URL = "https://bucket.s3.ap-southeast-2.amazonaws.com"
+
+
+def test_s3_key_from_url_decodes_the_path():
+    url = f"{BUCKET_URL}/chat_1/my%20report%20%28v2%29.pdf?X-Amz-Signature=abc"
+
+    assert s3_key_from_url(url) == "chat_1/my report (v2).pdf"
+
+
+def test_backfill_sets_only_missing_keys():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(
+            text("CREATE TABLE files (id INTEGER, file_url VARCHAR, s3_key VARCHAR)")
+        )
+        conn.execute(
+            text("INSERT INTO files VALUES (:id, :file_url, :s3_key)"),
+            [
+                {"id": 1, "file_url": f"{BUCKET_URL}/a%2Bb.png?x=1", "s3_key": None},
+                {"id": 2, "file_url": f"{BUCKET_URL}/old.png", "s3_key": "kept.png"},
+            ],
+        )
+
+        assert backfill_s3_keys(conn) == 1
+        keys = conn.execute(text("SELECT id, s3_key FROM files ORDER BY id")).all()
+
+    assert keys == [(1, "a+b.png"), (2, "kept.png")]
@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from langchain_tavily import TavilySearch
+
+from services.agent import search_clients
+from services.agent.search_clients import (
+    PooledGoogleSerperAPIWrapper,
+    PooledTavilySearchAPIWrapper,
+)
+
+
+def search_api(request: httpx.Request) -> httpx.Response:
+    if request.url.host == "api.tavily.com":
+        query = json.loads(request.content)["query"]
+        return httpx.Response(200, json={"query": query, "results": [{"url": "u"}]})
+    return httpx.Response(200, json={"organic": [{"title": request.url.params["q"]}]})
+
+
+@pytest.fixture
+def requests_sent(monkeypatch) -> list:
+    """Route the shared HTTP clients to a mock transport and record its requests."""
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        return search_api(request)
+
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setattr(
+        search_clients, "get_http_client", lambda: httpx.Client(transport=transport)
+    )
+    monkeypatch.setattr(
+        search_clients,
+        "get_async_http_client",
+        lambda: httpx.AsyncClient(transport=transport),
+    )
+    return sent
+
+
+def make_tavily() -> TavilySearch:
+    return TavilySearch(
+        max_results=5, api_wrapper=PooledTavilySearchAPIWrapper(tavily_api_key="key")
+    )
+
+
+def test_tavily_search_uses_the_shared_client(requests_sent):
+    result = make_tavily().run("kubernetes")
+
+    assert result["results"] == [{"url": "u"}]
+    [request] = requests_sent
+    assert request.url == "https://api.tavily.com/search"
+    assert request.headers["Authorization"] == "Bearer key"
+    assert json.loads(request.content) == {"query": "kubernetes", "max_results": 5}
+
+
+def test_tavily_async_search_uses_the_shared_client(requests_sent):
+    result = asyncio.run(make_tavily().arun("kubernetes"))
+
+    assert result["results"] == [{"url": "u"}]
+    assert len(requests_sent) == 1
+
+
+def test_serper_results_use_the_shared_client(requests_sent):
+    serper = PooledGoogleSerperAPIWrapper(serper_api_key="key")
+
+    assert serper.results("kubernetes")["organic"] == [{"title": "kubernetes"}]
+    assert asyncio.run(serper.aresults("helm"))["organic"] == [{"title": "helm"}]
+    assert [request.url.params["q"] for request in requests_sent] == [
+        "kubernetes",
+        "helm",
+    ]
+    assert requests_sent[0].headers["X-API-KEY"] == "key"
@@ -0,0 +1,56 @@
+from services.agent.semantic_cache import HashingEmbedder, SemanticCache
+
+
+def make_cache(threshold: float = 0.9) -> SemanticCache:
+    return SemanticCache(HashingEmbedder(), threshold=threshold)
+
+
+def store(cache: SemanticCache, question: str, message: str):
+    _, vector = cache.lookup(question)
+    cache.store(question, vector, message, [], [], latency_seconds=1.0)
+
+
+def test_hashing_embedder_is_deterministic():
+    embedder = HashingEmbedder()
+    assert embedder.embed("What is Kubernetes?") == embedder.embed(
+        "What is Kubernetes?"
+    )
+
+
+def test_same_question_with_different_case_and_punctuation_hits():
+    cache = make_cache()
+    store(cache, "What is Kubernetes?", "A container orchestrator.")
+
+    answer, _ = cache.lookup("what is kubernetes")
+
+    assert answer is not None
+    assert answer.message == "A container orchestrator."
+
+
+def test_different_question_words_do_not_match():
+    cache = make_cache()
+    store(cache, "When was Albert Einstein born?", "On 14 March 1879.")
+
+    answer, _ = cache.lookup("Where was Albert Einstein born?")
+
+    assert answer is None
+
+
+def test_negated_question_does_not_match():
+    cache = make_cache()
+    store(cache, "Is Python compiled?", "It is compiled to bytecode.")
+
+    answer, _ = cache.lookup("Is Python not compiled?")
+
+    assert answer is None
+
+
+def test_hits_report_saved_latency():
+    cache = make_cache()
+    store(cache, "What is Docker?", "A container runtime.")
+
+    cache.lookup("What is Docker?")
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["saved_seconds"] == 1.0
@@ -17,3 +17,28 @@ resource "aws_lambda_function" "app" {
     security_group_ids = [var.lambda_security_group_id]
   }
 }
+
+# Same image, migrations entry point; invoke once per release instead of on cold start
+resource "aws_lambda_function" "migrate" {
+  image_uri     = var.lambda_function_ecr_image_uri
+  function_name = "${var.lambda_function_name}-migrate"
+  role          = var.lambda_role_arn
+  timeout       = 300
+  memory_size   = 512
+  package_type  = "Image"
+
+  image_config {
+    command = ["src.migrate.handler"]
+  }
+
+  environment {
+    variables = {
+      SECRET_ARN = var.secret_arn
+    }
+  }
+
+  vpc_config {
+    subnet_ids         = var.subnet_ids
+    security_group_ids = [var.lambda_security_group_id]
+  }
+}
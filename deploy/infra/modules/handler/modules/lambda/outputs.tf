@@ -12,3 +12,8 @@ output "lambda_function_name" {
   description = "Name of the Lambda function"
   value       = aws_lambda_function.app.function_name
 }
+
+output "migrate_function_name" {
+  description = "Name of the Lambda function that applies database migrations"
+  value       = aws_lambda_function.migrate.function_name
+}